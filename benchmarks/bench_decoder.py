@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from lzw import *
+
+INPUTS = ['1.bmp', '2.txt', '3.txt', '4.txt', '5.txt', '6.txt']
+
+def decode_dict(codes, max_code):
+    """Decodificador anterior (dicionário código -> bytes em um dict), usado como referência."""
+    reverse_dicionario = {i: bytes([i]) for i in range(256)}
+    prefixo = None
+    result = bytearray()
+    for codigo in codes:
+        if codigo == max_code:
+            reverse_dicionario = {i: bytes([i]) for i in range(256)}
+            prefixo = None
+            continue
+        if codigo in reverse_dicionario:
+            entry = reverse_dicionario[codigo]
+        else:
+            entry = prefixo + prefixo[:1]
+        result.extend(entry)
+        if prefixo is not None and len(reverse_dicionario) < max_code:
+            reverse_dicionario[len(reverse_dicionario)] = prefixo + entry[:1]
+        prefixo = entry
+    return bytes(result)
+
+def decode_fast(codes, max_code):
+    return LZWDecoder(max_code, max_code).decode(codes)
+
+def best_time(func, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description='Velocidade de decodificação (MB/s de saída)')
+    parser.add_argument('--max_bits', type=int, default=12, help='Número máximo de bits')
+    parser.add_argument('--times', type=int, default=8, help='Repetições de cada entrada (aumenta o tamanho)')
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por medição (vale a mais rápida)')
+    args = parser.parse_args()
+
+    print(f"{'entrada':<10}{'MB':>8}{'dict MB/s':>12}{'rápido MB/s':>14}{'ganho':>8}")
+    for name in INPUTS:
+        with open(os.path.join(ROOT, 'inputs', name), 'rb') as f:
+            data = f.read() * args.times
+
+        lzw = LZW(args.max_bits, "flat")
+        codes = lzw.compress(data)
+
+        ref, t_ref = best_time(decode_dict, codes, lzw.max_code, repeat=args.repeat)
+        out, t_fast = best_time(decode_fast, codes, lzw.max_code, repeat=args.repeat)
+        assert ref == out == data
+
+        mb = len(data) / 1e6
+        print(f"{name:<10}{mb:>8.2f}{mb / t_ref:>12.2f}{mb / t_fast:>14.2f}{t_ref / t_fast:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
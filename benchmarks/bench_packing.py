@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from packing import *
+
+def pack_per_byte(codes, bits):
+    """Empacotador anterior (um byte por iteração), usado como referência."""
+    buffer = 0
+    bits_in_buffer = 0
+    output = bytearray()
+    for code in codes:
+        buffer |= (code << bits_in_buffer)
+        bits_in_buffer += bits
+        while bits_in_buffer >= 8:
+            output.append(buffer & 0xFF)
+            buffer >>= 8
+            bits_in_buffer -= 8
+    if bits_in_buffer > 0:
+        output.append(buffer & 0xFF)
+    return bytes(output)
+
+def unpack_per_byte(data, bits):
+    buffer = 0
+    bits_in_buffer = 0
+    mask = (1 << bits) - 1
+    codes = []
+    for byte in data:
+        buffer |= byte << bits_in_buffer
+        bits_in_buffer += 8
+        while bits_in_buffer >= bits:
+            codes.append(buffer & mask)
+            buffer >>= bits
+            bits_in_buffer -= bits
+    return codes
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def bench_fixed(bits, num_codes):
+    codes = [random.randrange(1 << bits) for _ in range(num_codes)]
+
+    packer = CodePacker(bits)
+    data, t_pack = timed(lambda: packer.pack(codes) + packer.flush())
+    decoded, t_unpack = timed(CodeUnpacker(bits).unpack, data)
+    assert decoded[:num_codes] == codes
+
+    _, t_pack_ref = timed(pack_per_byte, codes, bits)
+    _, t_unpack_ref = timed(unpack_per_byte, data, bits)
+    return len(data), t_pack, t_unpack, t_pack_ref, t_unpack_ref
+
+def bench_variable(max_bits, num_codes):
+    codes = [random.randrange(256) for _ in range(num_codes)]
+
+    packer = VariableCodePacker(max_bits)
+    data, t_pack = timed(lambda: packer.pack(codes) + packer.flush())
+    decoded, t_unpack = timed(VariableCodeUnpacker(max_bits).unpack, data)
+    assert decoded[:num_codes] == codes
+    return len(data), t_pack, t_unpack
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de empacotamento/desempacotamento por MB de saída')
+    parser.add_argument('--codes', type=int, default=1_000_000, help='Número de códigos por medição')
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'modo':<14}{'pack s/MB':>12}{'unpack s/MB':>14}{'ref pack':>12}{'ref unpack':>12}")
+    for bits in (9, 12, 16):
+        size, t_pack, t_unpack, t_pack_ref, t_unpack_ref = bench_fixed(bits, args.codes)
+        mb = size / 1e6
+        print(f"{'fixo ' + str(bits):<14}{t_pack / mb:>12.4f}{t_unpack / mb:>14.4f}{t_pack_ref / mb:>12.4f}{t_unpack_ref / mb:>12.4f}")
+
+    for max_bits in (12, 16):
+        size, t_pack, t_unpack = bench_variable(max_bits, args.codes)
+        mb = size / 1e6
+        print(f"{'variável ' + str(max_bits):<14}{t_pack / mb:>12.4f}{t_unpack / mb:>14.4f}{'-':>12}{'-':>12}")
+
+if __name__ == "__main__":
+    main()
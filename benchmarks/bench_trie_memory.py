@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from lzw import *
+
+INPUTS = ['1.bmp', '2.txt', '3.txt', '4.txt', '5.txt', '6.txt']
+
+def build(data, max_bits, engine):
+    lzw = LZW(max_bits, engine)
+    lzw.begin_compress()
+    for offset in range(0, len(data), CHUNK_SIZE):
+        lzw.compress_chunk(data[offset:offset + CHUNK_SIZE])
+    return lzw
+
+def lzw_dictionary(data, max_bits, engine):
+    """Comprime data e retorna (bytes alocados pelo dicionário, entradas, segundos sem o tracemalloc)."""
+    seeded_dictionary(engine, (1 << max_bits) - 1)   # o modelo em cache não entra na medição
+    tracemalloc.start()
+    lzw = build(data, max_bits, engine)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    build(data, max_bits, engine)
+    return used, lzw.dicionario_size, time.perf_counter() - start
+
+def word_dictionary(words):
+    """
+    Insere as palavras com insert() (arestas compactadas).
+    Retorna (bytes alocados, entradas, palavras que search() não encontra).
+    """
+    tracemalloc.start()
+    trie = CompactTrie(1 << 30)
+    for word in words:
+        trie.insert(word)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    missing = sum(1 for word in words if trie.search(word) is None)
+    return used, len(words), missing
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória por entrada do dicionário (trie e tabela plana)')
+    parser.add_argument('--max_bits', default='12,16', help='Valores de max_bits separados por vírgula')
+    args = parser.parse_args()
+
+    print(f"{'entrada':<10}{'bits':>5}{'engine':>7}{'entradas':>10}{'bytes/entrada':>15}{'MB/s':>8}")
+    for name in INPUTS:
+        with open(os.path.join(ROOT, 'inputs', name), 'rb') as f:
+            data = f.read()
+        for max_bits in [int(b) for b in args.max_bits.split(',')]:
+            for engine in ("trie", "flat"):
+                used, entries, elapsed = lzw_dictionary(data, max_bits, engine)
+                print(f"{name:<10}{max_bits:>5}{engine:>7}{entries:>10}{used / entries:>15.1f}"
+                      f"{len(data) / 1e6 / elapsed:>8.2f}")
+
+    words = []
+    for name in INPUTS[1:]:
+        with open(os.path.join(ROOT, 'inputs', name), 'rb') as f:
+            words.extend(f.read().split())
+    words = sorted(set(words))
+    used, entries, missing = word_dictionary(words)
+    print(f"insert() com {entries} palavras distintas: {used / entries:.1f} bytes/entrada, "
+          f"{missing} não encontradas por search()")
+
+if __name__ == "__main__":
+    main()
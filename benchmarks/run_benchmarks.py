@@ -0,0 +1,293 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import resource
+import subprocess
+import contextlib
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from lzw import *
+from parallel import *
+
+INPUTS = ['1.bmp', '2.txt', '3.txt', '4.txt', '5.txt', '6.txt']
+SYNTHETIC = ['aleatorio', 'repetitivo', 'texto']
+
+WORDS = ("de a o que e do da em um para com não uma os no se na por mais as dos como mas ao ele das "
+         "seu sua ou quando muito nos já eu também só pelo pela até isso ela entre depois sem mesmo "
+         "aos seus quem nas me esse eles você essa num nem suas meu às minha numa pelos elas qual "
+         "arquivo código dicionário compressão tempo dados bloco tamanho taxa saída entrada").split()
+
+# ---------------------------------------------------------------- corpora
+
+def parse_size(text):
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def _generate(kind, size, rng):
+    """Gera `size` bytes do tipo pedido, em pedaços de 1 MiB."""
+    piece = 1 << 20
+    for offset in range(0, size, piece):
+        n = min(piece, size - offset)
+        if kind == 'aleatorio':
+            yield rng.randbytes(n)
+        elif kind == 'repetitivo':
+            # Um padrão curto repetido, com mutações raras.
+            pattern = bytearray(b"registro=%d;status=ok;valor=0000\n" % (offset // piece))
+            data = bytearray((pattern * (n // len(pattern) + 1))[:n])
+            for _ in range(n // 4096):
+                data[rng.randrange(n)] = rng.randrange(256)
+            yield bytes(data)
+        else:
+            # Palavras com distribuição de Zipf, simulando texto.
+            weights = [1 / (i + 1) for i in range(len(WORDS))]
+            text = bytearray()
+            while len(text) < n:
+                text += " ".join(rng.choices(WORDS, weights, k=2000)).encode() + b".\n"
+            yield bytes(text[:n])
+
+def build_corpora(sizes, corpus_dir):
+    """Retorna [(nome, caminho)] com os arquivos de inputs/ e os corpora sintéticos (gerados uma vez)."""
+    corpora = [(name, os.path.join(ROOT, 'inputs', name)) for name in INPUTS]
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    for size in sizes:
+        for kind in SYNTHETIC:
+            name = f"{kind}-{size}"
+            path = os.path.join(corpus_dir, name + '.bin')
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                rng = random.Random(f"{kind}-{size}")
+                with open(path, 'wb') as f:
+                    for data in _generate(kind, size, rng):
+                        f.write(data)
+            corpora.append((name, path))
+    return corpora
+
+# ---------------------------------------------------------------- engines
+# Cada engine recebe o caminho de entrada e grava a saída no diretório atual.
+# Retorna (caminho de saída, estatísticas extras).
+
+def _fixed(dict_engine, **options):
+    def compress(path, max_bits):
+        lzw = LZW(max_bits, dict_engine, **options)
+        return compress_file(path, lzw), {"dictionary_full_at": lzw.stats["dictionary_full_at"], "clears": lzw.stats["clears"]}
+
+    def decompress(path, output_path, max_bits):
+        decompress_file(path, output_path, LZW(max_bits, dict_engine, **options))
+    return compress, decompress
+
+def _dynamic():
+    def compress(path, max_bits):
+        LZW_not_fixed_compress(path, max_bits)
+        return os.path.splitext(os.path.basename(path))[0] + '.lzw', {}
+
+    def decompress(path, output_path, max_bits):
+        decompress_file_not_fixed(path, output_path)
+    return compress, decompress
+
+def _parallel(jobs=None):
+    def compress(path, max_bits):
+        return compress_file_parallel(path, max_bits, jobs or os.cpu_count() or 1), {}
+
+    def decompress(path, output_path, max_bits):
+        decompress_file_parallel(path, output_path, jobs or os.cpu_count() or 1)
+    return compress, decompress
+
+ENGINES = {
+    "fixo-trie": _fixed("trie"),
+    "fixo-flat": _fixed("flat"),
+    "fixo-limpeza": _fixed("flat", clear_ratio=0.8),
+    "fixo-lru": _fixed("flat", eviction="lru"),
+    "variavel": _fixed("flat", variable_width=True),
+    "variavel-entropia": _fixed("flat", variable_width=True, entropy=True),
+    "dinamico": _dynamic(),
+    "paralelo": _parallel(),
+    "paralelo-1": _parallel(1),
+}
+
+# Referências de um processo para a aceleração do contêiner em blocos: o mesmo contêiner em um
+# processo só e o fluxo único com a mesma engine de dicionário (trie).
+PARALLEL_BASELINES = ("paralelo-1", "fixo-trie")
+
+# ---------------------------------------------------------------- worker
+
+def _file_hash(path):
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def run_worker(task):
+    """Executa uma fase (compressão ou descompressão) em um processo novo, para medir o pico de RSS."""
+    compress, decompress = ENGINES[task["engine"]]
+    os.chdir(task["workdir"])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if task["phase"] == "compress":
+            output_path, extra = compress(task["input"], task["max_bits"])
+        else:
+            output_path, extra = task["output"], {}
+            decompress(task["input"], output_path, task["max_bits"])
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "seconds": elapsed,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "output": os.path.abspath(output_path),
+        "output_size": os.path.getsize(output_path),
+    }
+    result.update(extra)
+    return result
+
+def spawn_worker(task):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', json.dumps(task)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{task['engine']} {task['phase']} falhou:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# ---------------------------------------------------------------- runner
+
+def best_of(task, repeat):
+    """Repete a fase e fica com a execução mais rápida (reduz o ruído da máquina)."""
+    return min((spawn_worker(task) for _ in range(repeat)), key=lambda r: r["seconds"])
+
+def bench_case(engine, name, path, max_bits, workdir, repeat=1):
+    size = os.path.getsize(path)
+    task = {"engine": engine, "phase": "compress", "input": path, "max_bits": max_bits, "workdir": workdir}
+    comp = best_of(task, repeat)
+
+    task = dict(task, phase="decompress", input=comp["output"], output=os.path.join(workdir, name + '.out'))
+    decomp = best_of(task, repeat)
+
+    ok = _file_hash(decomp["output"]) == _file_hash(path)
+    mb = size / 1e6
+    return {
+        "engine": engine,
+        "corpus": name,
+        "max_bits": max_bits,
+        "original_size": size,
+        "compressed_size": comp["output_size"],
+        "compression_ratio": size / comp["output_size"] if comp["output_size"] else 0,
+        "compress_mb_s": mb / comp["seconds"] if comp["seconds"] else 0,
+        "decompress_mb_s": mb / decomp["seconds"] if decomp["seconds"] else 0,
+        "compress_peak_rss_kb": comp["peak_rss_kb"],
+        "decompress_peak_rss_kb": decomp["peak_rss_kb"],
+        "dictionary_full_at": comp.get("dictionary_full_at"),
+        "clears": comp.get("clears"),
+        "roundtrip_ok": ok,
+    }
+
+def _delta(new, old):
+    return (new - old) / old * 100 if old else 0.0
+
+def compare(results, baseline, tolerance):
+    """Imprime a comparação com a linha de base e retorna as regressões acima da tolerância (%)."""
+    old = {(r["engine"], r["corpus"], r["max_bits"]): r for r in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'engine':<13}{'corpus':<18}{'comp MB/s':>16}{'decomp MB/s':>16}{'taxa':>14}{'RSS comp':>14}")
+    for r in results:
+        b = old.get((r["engine"], r["corpus"], r["max_bits"]))
+        if b is None:
+            continue
+        deltas = {
+            "compress_mb_s": _delta(r["compress_mb_s"], b["compress_mb_s"]),
+            "decompress_mb_s": _delta(r["decompress_mb_s"], b["decompress_mb_s"]),
+            "compression_ratio": _delta(r["compression_ratio"], b["compression_ratio"]),
+            "compress_peak_rss_kb": -_delta(r["compress_peak_rss_kb"], b["compress_peak_rss_kb"]),
+        }
+        print(f"{r['engine']:<13}{r['corpus']:<18}"
+              f"{r['compress_mb_s']:>8.2f} {deltas['compress_mb_s']:>+6.1f}%"
+              f"{r['decompress_mb_s']:>8.2f} {deltas['decompress_mb_s']:>+6.1f}%"
+              f"{r['compression_ratio']:>7.2f} {deltas['compression_ratio']:>+5.1f}%"
+              f"{r['compress_peak_rss_kb'] / 1024:>7.1f} {-deltas['compress_peak_rss_kb']:>+5.1f}%")
+        for metric, delta in deltas.items():
+            if delta < -tolerance:
+                regressions.append((r["engine"], r["corpus"], metric, delta))
+    return regressions
+
+def speedups(results):
+    """Imprime a aceleração de "paralelo" (todos os processadores) sobre as referências de um processo."""
+    by_case = {(r["engine"], r["corpus"]): r for r in results}
+    rows = []
+    for r in results:
+        if r["engine"] != "paralelo":
+            continue
+        for baseline in PARALLEL_BASELINES:
+            b = by_case.get((baseline, r["corpus"]))
+            if b is not None and b["compress_mb_s"] and b["decompress_mb_s"]:
+                rows.append((r["corpus"], baseline, r["compress_mb_s"] / b["compress_mb_s"],
+                             r["decompress_mb_s"] / b["decompress_mb_s"]))
+    if not rows:
+        return
+    print(f"\nAceleração de paralelo ({os.cpu_count() or 1} processadores)")
+    print(f"{'corpus':<20}{'sobre':<13}{'comp':>8}{'decomp':>8}")
+    for corpus, baseline, compress, decompress in rows:
+        print(f"{corpus:<20}{baseline:<13}{compress:>7.2f}x{decompress:>7.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de compressão LZW')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--engines', default=",".join(ENGINES), help='Engines separadas por vírgula')
+    parser.add_argument('--sizes', default='1M', help='Tamanhos dos corpora sintéticos (ex.: 1M,64M,1G)')
+    parser.add_argument('--max_bits', type=int, default=12, help='Número máximo de bits')
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'lzw-corpora'), help='Onde guardar os corpora gerados')
+    parser.add_argument('--repeat', type=int, default=1, help='Execuções por fase (vale a mais rápida)')
+    parser.add_argument('--output', help='Arquivo JSON com os resultados')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='Regressão máxima aceita (%%)')
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s]
+    engines = [e for e in args.engines.split(',') if e]
+    corpora = build_corpora(sizes, args.corpus_dir)
+
+    results = []
+    print(f"{'engine':<13}{'corpus':<18}{'comp MB/s':>10}{'decomp MB/s':>12}{'taxa':>7}{'RSS comp MB':>13}{'RSS decomp MB':>15}{'cheio em':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for engine in engines:
+            for name, path in corpora:
+                r = bench_case(engine, name, path, args.max_bits, workdir, args.repeat)
+                results.append(r)
+                full = r["dictionary_full_at"] if r["dictionary_full_at"] is not None else '-'
+                print(f"{engine:<13}{name:<18}{r['compress_mb_s']:>10.2f}{r['decompress_mb_s']:>12.2f}"
+                      f"{r['compression_ratio']:>7.2f}{r['compress_peak_rss_kb'] / 1024:>13.1f}"
+                      f"{r['decompress_peak_rss_kb'] / 1024:>15.1f}{full:>10}"
+                      f"{'' if r['roundtrip_ok'] else '  ERRO: saída diferente'}")
+
+    speedups(results)
+
+    report = {"max_bits": args.max_bits, "python": sys.version.split()[0], "cpus": os.cpu_count(), "results": results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = [r for r in results if not r["roundtrip_ok"]]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for engine, corpus, metric, delta in regressions:
+            print(f"REGRESSÃO: {engine} {corpus} {metric} {delta:+.1f}%")
+
+    sys.exit(1 if failed or regressions else 0)
+
+if __name__ == "__main__":
+    main()
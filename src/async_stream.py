@@ -0,0 +1,168 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from lzw import *
+
+# Compressão e descompressão incrementais para asyncio (sockets, pipes, uploads).
+# O estado do LZW é mantido entre os trechos; trechos grandes são processados no executor
+# para que o loop continue atendendo as outras conexões. Cada fluxo precisa do seu próprio
+# objeto LZW.
+
+# Trechos a partir deste tamanho vão para o executor; os menores são processados no próprio loop.
+EXECUTOR_THRESHOLD = 1 << 12
+
+# Executor padrão: uma única thread compartilhada. O LZW é Python puro (segura o GIL), então
+# mais threads não aumentam a vazão e só alongam as pausas do loop ao disputar o GIL.
+_default_executor = None
+
+def _shared_executor():
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lzw")
+    return _default_executor
+
+class _OutputBuffer:
+    """Saída sem seek do LZWWriter: acumula os bytes gravados até serem retirados com take()."""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        if data:
+            self.chunks.append(data)
+        return len(data)
+
+    def seekable(self):
+        return False
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class _Runner:
+    """Executa as etapas de um fluxo em ordem, no loop ou no executor conforme o tamanho."""
+    def __init__(self, executor, threshold):
+        self.executor = executor or _shared_executor()
+        self.threshold = threshold
+        self.lock = asyncio.Lock()
+
+    async def run(self, function, data):
+        async with self.lock:
+            if len(data) < self.threshold:
+                return function(data)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, data)
+
+class AsyncLZWCompressor:
+    """
+    Compressor incremental: feed() retorna os bytes comprimidos disponíveis até o momento e
+    flush() encerra o fluxo. A saída tem o mesmo formato de compress_file; como não há seek,
+    o cabeçalho não traz tamanho original nem CRC32. stored_blocks como em LZWWriter.
+    """
+    def __init__(self, lzw_compressor, executor=None, threshold=EXECUTOR_THRESHOLD, stored_blocks=False):
+        self.output = _OutputBuffer()
+        self.writer = LZWWriter(self.output, lzw_compressor, stored_blocks=stored_blocks)
+        self.runner = _Runner(executor, threshold)
+
+    def _feed(self, data):
+        self.writer.write(data)
+        return self.output.take()
+
+    def _flush(self, data):
+        self.writer.close()
+        return self.output.take()
+
+    async def feed(self, data):
+        return await self.runner.run(self._feed, data)
+
+    async def flush(self):
+        return await self.runner.run(self._flush, b"")
+
+class AsyncLZWDecompressor:
+    """
+    Descompressor incremental: feed() recebe trechos do arquivo comprimido e retorna os bytes
+    decodificados; flush() confere tamanho e CRC32 (se o cabeçalho os tiver) ao final.
+    Exige o cabeçalho de arquivo; o formato antigo e os arquivos com índice de acesso aleatório
+    (cujo final não é fluxo de bits) só podem ser lidos inteiros, com LZWReader.
+    """
+    def __init__(self, lzw_compressor, executor=None, threshold=EXECUTOR_THRESHOLD):
+        self.lzw = lzw_compressor
+        self.runner = _Runner(executor, threshold)
+        self.header = None
+        self.pending = b""
+
+    def _start(self):
+        if not has_file_header(self.pending):
+            raise ValueError("Fluxo sem o cabeçalho LZW")
+        header = FileHeader.unpack(self.pending[:FILE_HEADER.size])
+        if header.indexed:
+            raise ValueError("Arquivos com índice de acesso aleatório não podem ser lidos em streaming")
+        configure_decompressor(self.lzw, header)
+
+        self.header = header
+        self.check = OutputCheck(header)
+        self.unpacker = self.lzw.make_unpacker()
+        if header.stored:
+            frames = FrameDecoder(self.lzw, self.unpacker)
+            self._unpack, self._decode = frames.unpack, frames.decode
+        else:
+            self._unpack, self._decode = self.unpacker.unpack, self.lzw.decompress_chunk
+        self.lzw.begin_decompress()
+
+        data = self.pending[FILE_HEADER.size:]
+        self.pending = b""
+        return data
+
+    def _feed(self, data):
+        if self.header is None:
+            self.pending += data
+            if len(self.pending) < FILE_HEADER.size:
+                return b""
+            data = self._start()
+
+        decoded = self._decode(self._unpack(data))
+        self.check.update(decoded)
+        return decoded
+
+    def _flush(self, data):
+        if self.header is None:
+            raise ValueError("Fluxo comprimido incompleto")
+        self.check.finish()
+        return b""
+
+    async def feed(self, data):
+        return await self.runner.run(self._feed, data)
+
+    async def flush(self):
+        return await self.runner.run(self._flush, b"")
+
+async def _pump(coder, reader, writer, chunk_size):
+    total_in = total_out = 0
+    while True:
+        data = await reader.read(chunk_size)
+        if not data:
+            break
+        total_in += len(data)
+        output = await coder.feed(data)
+        if output:
+            total_out += len(output)
+            writer.write(output)
+            await writer.drain()
+
+    output = await coder.flush()
+    if output:
+        total_out += len(output)
+        writer.write(output)
+    await writer.drain()
+    return total_in, total_out
+
+async def compress_stream(reader, writer, lzw_compressor, chunk_size=CHUNK_SIZE, executor=None, stored_blocks=False):
+    """
+    Comprime tudo o que chegar em reader (asyncio.StreamReader) até o EOF, escrevendo em writer
+    (asyncio.StreamWriter) com drain() a cada trecho. O writer não é fechado.
+    Retorna (bytes lidos, bytes escritos).
+    """
+    return await _pump(AsyncLZWCompressor(lzw_compressor, executor, stored_blocks=stored_blocks), reader, writer, chunk_size)
+
+async def decompress_stream(reader, writer, lzw_compressor, chunk_size=CHUNK_SIZE, executor=None):
+    """Operação inversa de compress_stream. Retorna (bytes lidos, bytes escritos)."""
+    return await _pump(AsyncLZWDecompressor(lzw_compressor, executor), reader, writer, chunk_size)
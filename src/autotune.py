@@ -0,0 +1,166 @@
+import time
+
+from lzw import *
+
+# Seleção automática de parâmetros (--auto): comprime uma amostra da entrada (trechos
+# espaçados, concatenados em um só fluxo) com cada max_bits, empacota os códigos em cada formato
+# (largura fixa, variável, variável com entropia) e escolhe a configuração mais rápida que
+# atinge a meta; a engine é a mais rápida das duas na configuração escolhida. As taxas e
+# velocidades são estimativas: na amostra o dicionário enche menos vezes do que na entrada.
+
+AUTO_MAX_BITS = (12, 14, 16)
+AUTO_FORMATS = ((False, False), (True, False), (True, True))   # (largura variável, entropia)
+
+# Fração do tempo da compressão que os testes podem ocupar.
+AUTO_BUDGET = 0.02
+
+# Custo dos testes em compressões da amostra (medido): uma por max_bits com a trie, o
+# empacotamento com entropia e a comparação com a flat, mais lenta. A amostra, com o dicionário
+# ainda crescendo, é comprimida cerca de duas vezes mais devagar por byte que a entrada inteira.
+AUTO_TRIAL_COST = 16
+
+# Trechos da amostra e limites do seu tamanho total. Entradas pequenas usam a amostra mínima
+# (ou a entrada inteira), mesmo que os testes passem do orçamento: o custo fixo é pequeno.
+AUTO_SLICES = 8
+MIN_AUTO_SAMPLE = 1 << 14
+MAX_AUTO_SAMPLE = 1 << 24
+
+# Sem meta explícita: a mais rápida entre as que ficam a esta fração da melhor taxa.
+AUTO_TOLERANCE = 0.98
+
+def sample_input(data, size, slices=AUTO_SLICES):
+    """Amostra de cerca de `size` bytes: `slices` trechos igualmente espaçados da entrada."""
+    if size >= len(data):
+        return bytes(data)
+    piece = size // slices
+    step = (len(data) - piece) // (slices - 1)
+    return b"".join(data[i * step:i * step + piece] for i in range(slices))
+
+def _timed_compress(sample, max_bits, dict_engine, options):
+    lzw = LZW(max_bits, dict_engine, **options)
+    start = time.perf_counter()
+    codes = lzw.compress(sample)
+    return lzw, codes, time.perf_counter() - start
+
+def _fits(max_bits, options):
+    """O dicionário treinado (se houver) deixa códigos livres com max_bits."""
+    dictionary = options.get("dictionary")
+    return dictionary is None or dictionary.first_code < (1 << max_bits) - 1
+
+def _measure(sample, options, allow_entropy=True):
+    """Taxa e velocidade estimadas (bytes/s) de cada max_bits e formato, com a trie."""
+    candidates = []
+    for max_bits in AUTO_MAX_BITS:
+        if not _fits(max_bits, options):
+            continue
+        lzw, codes, seconds = _timed_compress(sample, max_bits, "trie", options)
+        for variable_width, entropy in AUTO_FORMATS:
+            if entropy and not allow_entropy:
+                continue
+            lzw.variable_width = variable_width
+            lzw.entropy = entropy
+            packer = lzw.make_packer()
+            start = time.perf_counter()
+            size = len(packer.pack(codes)) + len(packer.flush())
+            pack_seconds = time.perf_counter() - start
+            candidates.append({
+                "max_bits": max_bits,
+                "dict_engine": "trie",
+                "variable_width": variable_width,
+                "entropy": entropy,
+                "taxa": len(sample) / max(size, 1),
+                "segundos": seconds,
+                "segundos_empacotamento": pack_seconds,
+                "velocidade": len(sample) / max(seconds + pack_seconds, 1e-9),
+            })
+    return candidates
+
+def _pick(candidates, target_ratio=None, target_throughput=None):
+    """Escolhe a configuração pela meta e retorna (candidata, motivo)."""
+    best_ratio = max(c["taxa"] for c in candidates)
+    fastest = max(candidates, key=lambda c: c["velocidade"])
+
+    if target_throughput is not None:
+        meeting = [c for c in candidates if c["velocidade"] >= target_throughput * 1e6]
+        if not meeting:
+            return fastest, f"nenhuma configuração atingiu {target_throughput:g} MB/s na amostra; escolhida a mais rápida"
+        return max(meeting, key=lambda c: c["taxa"]), f"maior taxa entre as que atingem {target_throughput:g} MB/s"
+
+    if target_ratio is None:
+        target = best_ratio * AUTO_TOLERANCE
+        reason = f"mais rápida com taxa até {100 * (1 - AUTO_TOLERANCE):g}% abaixo da melhor da amostra ({best_ratio:.2f})"
+    else:
+        target = target_ratio
+        reason = f"mais rápida entre as que atingem a taxa {target_ratio:g}"
+    meeting = [c for c in candidates if c["taxa"] >= target]
+    if not meeting:
+        return max(candidates, key=lambda c: c["taxa"]), f"nenhuma configuração atingiu a taxa {target_ratio:g} na amostra; escolhida a de maior taxa"
+    return max(meeting, key=lambda c: c["velocidade"]), reason
+
+def _untuned(requested, reason, start):
+    """Sem testes: mantém os parâmetros pedidos na linha de comando."""
+    return dict(requested, motivo=f"{reason}; sem ajuste, mantidos os parâmetros pedidos", amostra=0,
+                tempo_testes=time.perf_counter() - start, taxa_estimada=None, velocidade_estimada=None)
+
+def choose_parameters(input_file_path, target_ratio=None, target_throughput=None, allow_entropy=True, budget=AUTO_BUDGET,
+                      requested=None, **options):
+    """
+    Escolhe max_bits, engine, largura dos códigos e entropia para comprimir o arquivo. A meta é
+    uma taxa mínima (target_ratio), uma velocidade mínima em MB/s (target_throughput) ou, sem
+    nenhuma das duas, a taxa a AUTO_TOLERANCE da melhor. A amostra é dimensionada para que os
+    testes levem cerca de `budget` do tempo da compressão (ver AUTO_TRIAL_COST), com no mínimo
+    MIN_AUTO_SAMPLE bytes. Com a entrada vazia ou sem max_bits em que o dicionário treinado
+    caiba, não há testes e valem os parâmetros pedidos (requested: max_bits, dict_engine,
+    variable_width, entropy). Retorna um dicionário com a escolha, o motivo e as medidas. Os
+    demais parâmetros do LZW (options: clear_ratio, dictionary, eviction) são mantidos nos testes.
+    """
+    start = time.perf_counter()
+    if requested is None:
+        requested = {"max_bits": 12, "dict_engine": "trie", "variable_width": False, "entropy": False}
+    if not any(_fits(max_bits, options) for max_bits in AUTO_MAX_BITS):
+        return _untuned(requested, "o dicionário treinado não cabe em nenhum max_bits testado", start)
+    with open(input_file_path, 'rb') as f:
+        data = map_file(f)
+    if not data:
+        return _untuned(requested, "entrada vazia", start)
+
+    sample_size = min(max(int(len(data) * budget / AUTO_TRIAL_COST), MIN_AUTO_SAMPLE), MAX_AUTO_SAMPLE)
+    sample = sample_input(data, sample_size)
+    del data
+    candidates = _measure(sample, options, allow_entropy)
+    choice, reason = _pick(candidates, target_ratio, target_throughput)
+
+    # A engine não muda a taxa: compara a flat com a trie na configuração escolhida.
+    _, _, seconds = _timed_compress(sample, choice["max_bits"], "flat", options)
+    if seconds < choice["segundos"]:
+        choice = dict(choice, dict_engine="flat", velocidade=len(sample) / max(seconds + choice["segundos_empacotamento"], 1e-9))
+    return {
+        "max_bits": choice["max_bits"], "dict_engine": choice["dict_engine"],
+        "variable_width": choice["variable_width"], "entropy": choice["entropy"],
+        "motivo": reason, "amostra": len(sample), "tempo_testes": time.perf_counter() - start,
+        "taxa_estimada": choice["taxa"], "velocidade_estimada": choice["velocidade"] / 1e6,
+    }
+
+def auto_compressor(input_file_path, target_ratio=None, target_throughput=None, allow_entropy=True, requested=None, **options):
+    """LZW configurado por choose_parameters; a escolha fica em stats["auto"]."""
+    prof = get_profiler()
+    if prof:
+        previous = prof.switch("selecao_automatica")
+    choice = choose_parameters(input_file_path, target_ratio, target_throughput, allow_entropy, requested=requested, **options)
+    lzw = LZW(choice["max_bits"], choice["dict_engine"], variable_width=choice["variable_width"], entropy=choice["entropy"],
+              **options)
+    lzw.stats["auto"] = choice
+    if prof:
+        prof.switch(previous)
+        prof.mark("parametros_automaticos", choice)
+    return lzw
+
+def describe_choice(choice):
+    """Descrição de uma linha da escolha de choose_parameters."""
+    details = [f"max_bits={choice['max_bits']}", f"dicionário {choice['dict_engine']}",
+               "largura variável" if choice["variable_width"] else "largura fixa"]
+    if choice["entropy"]:
+        details.append("entropia")
+    if choice["taxa_estimada"] is not None:
+        details.append(f"taxa estimada {choice['taxa_estimada']:.2f}, {choice['velocidade_estimada']:.2f} MB/s")
+    return f"{', '.join(details)} ({choice['motivo']}; testes: {choice['tempo_testes']:.3f} s)"
@@ -0,0 +1,181 @@
+import io
+import os
+import glob
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from lzw import *
+from parallel import *
+from trained_dictionary import *
+
+# Modo em lote: vários arquivos processados por um pool de processos persistente.
+# Cada processo cria um único compressor (dicionário inicial copiado do modelo em reset())
+# e o reutiliza em todos os arquivos que recebe.
+
+# Estado de cada processo do pool, criado por _init_worker.
+_worker = {}
+
+def collect_inputs(paths):
+    """
+    Expande a lista de entradas: diretórios (recursivamente), padrões glob e listas de
+    arquivos (@lista.txt, um caminho por linha). Retorna pares (caminho, caminho relativo
+    usado na saída); arquivos de diretórios mantêm a estrutura de subdiretórios.
+    """
+    inputs = []
+    for path in paths:
+        if path.startswith('@'):
+            with open(path[1:]) as f:
+                inputs.extend(collect_inputs([line.strip() for line in f if line.strip()]))
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    inputs.append((file_path, os.path.relpath(file_path, path)))
+        elif glob.has_magic(path):
+            inputs.extend(collect_inputs(sorted(glob.glob(path, recursive=True))))
+        else:
+            inputs.append((path, os.path.basename(path)))
+    return inputs
+
+def output_path_for(input_path, relative_path, output_dir):
+    """
+    Caminho de saída de um arquivo no lote. A extensão original é mantida (a.txt -> a.txt.lzw),
+    para que arquivos com o mesmo nome e extensões diferentes não colidam e a descompressão
+    (a.txt.lzw -> a.txt) restaure o nome original.
+    """
+    if input_path.endswith('.lzw'):
+        relative_path = relative_path[:-len('.lzw')]
+    else:
+        relative_path += '.lzw'
+    return os.path.join(output_dir, relative_path)
+
+def _init_worker(options):
+    _worker["options"] = options
+    _worker["dictionary"] = load_dictionary(options["dictionary"]) if options["dictionary"] else None
+    _worker["cache"] = ResultCache(options["cache_dir"], options["cache_size"]) if options["cache_dir"] else None
+    if not options["dinamico"]:
+        _worker["lzw"] = LZW(options["max_bits"], options["dict_engine"], options["clear_ratio"],
+                             options["variable_width"], _worker["dictionary"], options["entropy"],
+                             options["eviction"])
+
+def _compressor():
+    """O compressor do processo, com dicionário novo e as opções pedidas (a descompressão pode tê-las alterado)."""
+    lzw = _worker["lzw"]
+    lzw.variable_width = _worker["options"]["variable_width"]
+    lzw.entropy = _worker["options"]["entropy"]
+    lzw.eviction = _worker["options"]["eviction"]
+    max_bits = _worker["options"]["max_bits"]
+    if lzw.max_bits != max_bits:
+        lzw.set_max_bits(max_bits)
+    else:
+        lzw.reset()
+    return lzw
+
+def _process(task):
+    input_path, output_path = task
+    options = _worker["options"]
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    start = time.perf_counter()
+    cache = _worker["cache"]
+    hit = None
+    try:
+        # As mensagens de cada arquivo ficam de fora; o resumo é impresso pelo processo principal.
+        with contextlib.redirect_stdout(io.StringIO()):
+            if input_path.endswith('.lzw'):
+                if is_block_container(input_path):
+                    decompress_file_parallel(input_path, output_path, dictionary=_worker["dictionary"])
+                elif options["dinamico"]:
+                    decompress_file_not_fixed(input_path, output_path, _worker["dictionary"])
+                else:
+                    decompress_file(input_path, output_path, _compressor())
+            elif options["dinamico"]:
+                compress = lambda: LZW_not_fixed_compress(input_path, options["max_bits"], options["clear_ratio"], output_path,
+                                                          _worker["dictionary"], options["entropy"], options["eviction"])
+                if cache is None:
+                    compress()
+                else:
+                    hit = cached_compress(cache, input_path, output_path,
+                                          dynamic_parameters(options["max_bits"], options["clear_ratio"], _worker["dictionary"],
+                                                             options["entropy"], options["eviction"]), compress)
+            else:
+                lzw = _compressor()
+                compress = lambda: compress_file(input_path, lzw, output_path, stored_blocks=options["stored_blocks"])
+                if cache is None:
+                    compress()
+                else:
+                    hit = cached_compress(cache, input_path, output_path,
+                                          compression_parameters(lzw, stored_blocks=options["stored_blocks"]), compress)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "input": input_path,
+        "output": output_path,
+        "input_size": os.path.getsize(input_path),
+        "output_size": os.path.getsize(output_path) if error is None else 0,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        "cache": None if hit is None else ("acerto" if hit else "falha"),
+    }
+
+def run_batch(paths, output_dir, jobs=1, max_bits=12, dict_engine="trie", clear_ratio=None, variable_width=False, dinamico=False,
+              dictionary_path=None, entropy=False, eviction=None, stored_blocks=False, cache_dir=None, cache_size=CACHE_SIZE):
+    """
+    Comprime (ou descomprime, para entradas .lzw) todos os arquivos das entradas em output_dir.
+    Com cache_dir, as compressões passam pelo cache de resultados (ResultCache) nesse diretório.
+    Imprime uma linha por arquivo e retorna a lista de resumos.
+    """
+    options = {
+        "max_bits": max_bits,
+        "dict_engine": dict_engine,
+        "clear_ratio": clear_ratio,
+        "variable_width": variable_width,
+        "dinamico": dinamico,
+        "dictionary": dictionary_path,
+        "entropy": entropy,
+        "eviction": eviction,
+        "stored_blocks": stored_blocks,
+        "cache_dir": cache_dir,
+        "cache_size": cache_size,
+    }
+    tasks = [(path, output_path_for(path, relative, output_dir)) for path, relative in collect_inputs(paths)]
+
+    if jobs <= 1:
+        _init_worker(options)
+        results = map(_process, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(options,))
+        # chunksize > 1 reduz a troca de mensagens com muitos arquivos pequenos.
+        results = executor.map(_process, tasks, chunksize=max(1, len(tasks) // (jobs * 8)))
+
+    summary = []
+    start = time.perf_counter()
+    try:
+        for r in results:
+            summary.append(r)
+            if r["error"]:
+                print(f"{r['input']}: ERRO {r['error']}")
+            else:
+                ratio = r["input_size"] / r["output_size"] if r["output_size"] else 0
+                cached = ", cache" if r["cache"] == "acerto" else ""
+                print(f"{r['input']} -> {r['output']}: {r['input_size']} -> {r['output_size']} bytes "
+                      f"(taxa {ratio:.2f}, {r['seconds']:.3f} s{cached})")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    total_in = sum(r["input_size"] for r in summary)
+    total_out = sum(r["output_size"] for r in summary)
+    errors = sum(1 for r in summary if r["error"])
+    print(f"Total: {len(summary)} arquivos, {total_in} -> {total_out} bytes, "
+          f"{errors} erros, {time.perf_counter() - start:.2f} s")
+    if cache_dir:
+        hits = sum(1 for r in summary if r["cache"] == "acerto")
+        misses = sum(1 for r in summary if r["cache"] == "falha")
+        print(f"Cache ({cache_dir}): {hits} acertos, {misses} falhas")
+    return summary
@@ -0,0 +1,176 @@
+import os
+import shutil
+import hashlib
+
+# Cache local de resultados: o arquivo comprimido (ou o bloco, no contêiner em blocos) fica
+# guardado sob uma chave formada pelo hash do conteúdo da entrada e pelos parâmetros que
+# definem a saída; uma nova compressão da mesma entrada com os mesmos parâmetros apenas copia
+# o resultado. Blocos iguais, no mesmo arquivo ou em arquivos diferentes, têm a mesma chave e
+# são guardados uma vez. O espaço ocupado é limitado: ao passar de max_bytes, os resultados
+# usados há mais tempo (data de modificação, atualizada a cada acerto) são apagados.
+
+# Limite padrão do espaço ocupado pelo cache.
+CACHE_SIZE = 1 << 30
+
+# Depois de um descarte, o cache fica com no máximo esta fração do limite (evita um descarte
+# a cada novo resultado quando ele está cheio).
+CACHE_LOW_WATER = 0.9
+
+def content_hash(data):
+    """Hash do conteúdo (BLAKE2b de 128 bits, em hexadecimal)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def compression_parameters(lzw_compressor, index_interval=None, stored_blocks=False):
+    """
+    Parâmetros que definem a saída de compress_file. A engine do dicionário fica de fora:
+    trie e tabela plana produzem os mesmos códigos.
+    """
+    lzw = lzw_compressor
+    clear_ratio = lzw.clear_policy.threshold if lzw.clear_policy else None
+    dictionary_id = f"{lzw.dictionary.id:08x}" if lzw.dictionary else None
+    return (f"fixo max_bits={lzw.max_bits} variavel={lzw.variable_width} entropia={lzw.entropy} "
+            f"descarte={lzw.eviction} limpeza={clear_ratio} dicionario={dictionary_id} "
+            f"indice={index_interval} guardados={stored_blocks}")
+
+def dynamic_parameters(max_bits, clear_ratio=None, dictionary=None, entropy=False, eviction=None):
+    """Parâmetros que definem a saída de LZW_not_fixed_compress."""
+    dictionary_id = f"{dictionary.id:08x}" if dictionary else None
+    return (f"dinamico max_bits={max_bits} entropia={entropy} descarte={eviction} "
+            f"limpeza={clear_ratio} dicionario={dictionary_id}")
+
+class ResultCache:
+    """
+    Resultados em arquivos de um diretório (um subdiretório por prefixo da chave). Vários
+    processos podem usar o mesmo diretório: cada resultado é gravado em um arquivo temporário e
+    renomeado, e cada processo controla o limite com a sua estimativa do espaço ocupado.
+    """
+    def __init__(self, directory, max_bytes=CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+        # O limite pode ter diminuído desde a última vez que o diretório foi usado.
+        self._enforce()
+
+    def refresh(self):
+        """Recalcula o espaço ocupado (o diretório pode ter sido alterado por outros processos)."""
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def key(self, digest, parameters):
+        """Chave de um resultado: hash do conteúdo da entrada e parâmetros da compressão."""
+        return hashlib.blake2b(f"{digest} {parameters}".encode(), digest_size=16).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".lzw")
+
+    def _entries(self):
+        """(caminho, tamanho, data de modificação) de cada resultado guardado."""
+        entries = []
+        for subdir in os.scandir(self.directory):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith(".lzw"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue    # apagado por outro processo
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _hit(self, path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        self._enforce()
+
+    def get(self, key):
+        """Bytes guardados sob a chave, ou None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self._hit(path)
+        return data
+
+    def fetch(self, key, output_path):
+        """Copia o resultado guardado para output_path. Retorna False se não houver."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self._hit(path)
+        return True
+
+    def _store(self, key, write):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        write(temp_path)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+        self.size += size
+        self._enforce()
+
+    def _enforce(self):
+        if self.size > self.max_bytes:
+            self._evict()
+
+    def put(self, key, data):
+        """Guarda bytes sob a chave."""
+        def write(temp_path):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        self._store(key, write)
+
+    def store(self, key, input_path):
+        """Guarda uma cópia do arquivo sob a chave."""
+        self._store(key, lambda temp_path: shutil.copyfile(input_path, temp_path))
+
+    def _evict(self):
+        """Apaga os resultados usados há mais tempo até o cache ficar abaixo de CACHE_LOW_WATER do limite."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * CACHE_LOW_WATER
+        for path, size, _ in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def stats(self):
+        return {"acertos": self.hits, "falhas": self.misses, "descartes": self.evictions, "tamanho": self.size}
+
+    def print_stats(self):
+        print(f"Cache ({self.directory}): {self.hits} acertos, {self.misses} falhas, "
+              f"{self.evictions} descartes, {self.size} bytes")
+
+def cached_compress(cache, input_file_path, compressed_file_path, parameters, compress):
+    """
+    Gera compressed_file_path a partir do cache ou, se o resultado não estiver nele, com
+    compress() (que grava o arquivo), guardando o resultado. Retorna True em um acerto.
+    """
+    with open(input_file_path, 'rb') as f:
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    key = cache.key(digest.hexdigest(), parameters)
+    if cache.fetch(key, compressed_file_path):
+        return True
+    compress()
+    cache.store(key, compressed_file_path)
+    return False
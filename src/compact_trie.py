@@ -1,129 +1,304 @@
 from node import *
+from packing import *
 from typing import List, Tuple, Union, Dict
 
 class CompactTrie:
+    """
+    Trie compacta (arestas com rótulos de vários bytes). Os rótulos ficam em um único buffer,
+    self.labels, e cada nó guarda apenas (início, tamanho) do seu trecho (ver Node).
+    """
     def __init__(self, max_code):
         self.root = Node()
+        self.labels = bytearray()
         self.next_code = 0
         self.max_code = max_code
+        self.cursor = self.root
+        self.splits = 0     # divisões de arestas compactadas (instrumentação)
+        # Posições de rótulos de um byte liberadas por remove(), reutilizadas por insert_at_cursor.
+        self.free_labels = []
+
+    def _new_node(self, label, code):
+        """Cria um nó com o rótulo (bytes) acrescentado ao buffer compartilhado."""
+        start = len(self.labels)
+        self.labels += label
+        return Node(start, len(label), code)
+
+    def _label(self, node):
+        return bytes(self.labels[node.start:node.start + node.length])
+
+    def _split(self, node, size):
+        """Divide a aresta do nó após `size` bytes: o nó fica com o início e um filho novo com o resto."""
+        self.splits += 1
+        tail = Node(node.start + size, node.length - size, node.code)
+        tail.children = node.children
+        node.length = size
+        node.code = None
+        node.children = tail
+        return tail
+
+    def _child(self, node, byte):
+        """Filho do nó cujo rótulo começa com o byte, ou None."""
+        children = node.children
+        if children is None:
+            return None
+        if children.__class__ is dict:
+            return children.get(byte)
+        return children if self.labels[children.start] == byte else None
+
+    def _add_child(self, node, byte, child):
+        children = node.children
+        if children is None:
+            node.children = child
+            return
+        if children.__class__ is not dict:
+            node.children = children = {self.labels[children.start]: children}
+        children[byte] = child
+
+    def _remove_child(self, node, byte):
+        children = node.children
+        if children.__class__ is not dict:
+            node.children = None
+            return
+        del children[byte]
+        if len(children) == 1:
+            node.children = next(iter(children.values()))
+
+    def _children(self, node):
+        children = node.children
+        if children is None:
+            return ()
+        return children.values() if children.__class__ is dict else (children,)
+
+    def _next_code(self, code):
+        if code is None:
+            code = self.next_code
+            self.next_code += 1
+        return code
+
+    def reset_cursor(self):
+        """Posiciona o cursor na raiz (sequência vazia)."""
+        self.cursor = self.root
+
+    def step(self, byte: int):
+        """
+        Avança o cursor por um byte a partir do nó atual.
+        Retorna True se a sequência resultante existe como palavra; caso contrário o cursor não se move.
+        """
+        children = self.cursor.children
+        if children is None:
+            return False
+        if children.__class__ is dict:
+            child = children.get(byte)
+        else:
+            # Filho único, guardado diretamente no nó.
+            child = children if self.labels[children.start] == byte else None
+        if child is not None and child.code is not None and child.length == 1:
+            self.cursor = child
+            return True
+        return False
 
-    def search(self, word: bytes):
-        """Retorna o código do nó correspondente a palavra ou prefixo."""
-        current_node = self.root
+    def cursor_code(self):
+        """Retorna o código da sequência apontada pelo cursor."""
+        return self.cursor.code
+
+    def insert_at_cursor(self, byte: int, code: int):
+        """
+        Insere a sequência (cursor + byte) com o código informado, sem percorrer a trie a partir da raiz.
+        Se o limite de códigos for atingido, nada é inserido.
+        """
+        if code >= self.max_code:
+            return None
+
+        cursor = self.cursor
+        child = self._child(cursor, byte)
+
+        if child is None:
+            if self.free_labels:
+                start = self.free_labels.pop()
+                self.labels[start] = byte
+            else:
+                start = len(self.labels)
+                self.labels.append(byte)
+            self._add_child(cursor, byte, Node(start, 1, code))
+        else:
+            if child.length > 1:
+                # Aresta compactada: divide o rótulo após o primeiro byte.
+                self._split(child, 1)
+            child.code = code
+
+        return code
+
+    def copy(self):
+        """Cópia independente da trie (nós novos e cópia do buffer de rótulos), com o cursor na raiz."""
+        clone = CompactTrie(self.max_code)
+        clone.next_code = self.next_code
+        clone.labels = bytearray(self.labels)
+        clone.free_labels = self.free_labels[:]
+        stack = [(self.root, clone.root)]
+        while stack:
+            source, target = stack.pop()
+            children = source.children
+            if children is None:
+                continue
+            if children.__class__ is dict:
+                target.children = {}
+                for key, child in children.items():
+                    node = Node(child.start, child.length, child.code)
+                    target.children[key] = node
+                    stack.append((child, node))
+            else:
+                target.children = node = Node(children.start, children.length, children.code)
+                stack.append((children, node))
+        return clone
+
+    def entries(self, first_code=256):
+        """
+        (códigos dos prefixos, últimos bytes) das entradas a partir de first_code, na ordem dos
+        códigos. Vale para dicionários LZW: todo nó abaixo da raiz tem rótulo de um byte e código.
+        """
+        found = []
+        stack = [(self.root, None)]
+        while stack:
+            node, code = stack.pop()
+            for child in self._children(node):
+                if child.length != 1 or child.code is None or (code is None and child.code >= 256):
+                    raise ValueError("A trie não é um dicionário LZW (arestas de um byte com código)")
+                if child.code >= first_code:
+                    found.append((child.code, code, self.labels[child.start]))
+                stack.append((child, child.code))
+
+        found.sort()
+        if found and found[-1][0] != first_code + len(found) - 1:
+            raise ValueError("Os códigos do dicionário não são contíguos")
+        return array(SLOT_TYPECODE, [f[1] for f in found]), bytes(f[2] for f in found)
+
+    def dump(self):
+        """Entradas a partir do código 256 em bytes (prefixos em 32 bits e últimos bytes), para snapshots."""
+        prefixes, suffixes = self.entries()
+        return array_bytes(prefixes) + suffixes
+
+    @classmethod
+    def load(cls, max_code, data, cursor=None):
+        """Reconstrói a trie gravada por dump(), com os prefixos lidos em bloco (ver from_entries)."""
+        if len(data) % 5:
+            raise ValueError("Estado da trie corrompido")
+        count = len(data) // 5
+        return cls.from_entries(max_code, array_from_bytes(SLOT_TYPECODE, data[:4 * count]), data[4 * count:], cursor)
+
+    @classmethod
+    def from_entries(cls, max_code, prefixes, suffixes, cursor=None):
+        """
+        Trie com as 256 entradas de um byte e as entradas 256, 257, ... dadas por (código do
+        prefixo, último byte): cada uma vira um nó filho do nó do seu prefixo, sem percorrer a
+        trie a partir da raiz. Os rótulos das entradas são o próprio vetor de últimos bytes.
+        """
+        trie = cls(max_code)
+        trie.labels = bytearray(range(256)) + suffixes
+        nodes = [Node(i, 1, i) for i in range(256)]
+        trie.root.children = dict(enumerate(nodes))
+        add_child = trie._add_child
+        for i, prefix in enumerate(prefixes):
+            node = Node(256 + i, 1, 256 + i)
+            add_child(nodes[prefix], suffixes[i], node)
+            nodes.append(node)
+
+        if cursor is not None:
+            trie.cursor = nodes[cursor]
+        return trie
+
+    def _find(self, word):
+        """Caminho de nós (a partir da raiz) cujos rótulos formam exatamente word, ou None."""
+        path = [self.root]
+        node = self.root
         i = 0
         while i < len(word):
-            key = word[i:i+1]
-            if key not in current_node.children:
+            child = self._child(node, word[i])
+            if child is None or word[i:i + child.length] != self._label(child):
                 return None
-            current_node = current_node.children[key]
-            i += 1
-        return current_node.code if current_node.isEndOfWord else None
+            i += child.length
+            node = child
+            path.append(node)
+        return path
+
+    def search(self, word: bytes):
+        """Retorna o código da palavra, ou None se ela não estiver na trie."""
+        if not word:
+            return None
+        path = self._find(word)
+        return path[-1].code if path else None
 
     def cpl(self, prefix1, prefix2):
-        """Calcula o tamanho do prefixo comum entre dois blocos de bytes."""
-        min_len = min(len(prefix1), len(prefix2))
-        for i in range(min_len):
-            if prefix1[i] != prefix2[i]:
-                return i
-        return min_len
+        """
+        Calcula o tamanho do prefixo comum entre dois blocos de bytes. Compara fatias (em C) e,
+        se diferirem, localiza a primeira diferença por busca binária.
+        """
+        n = min(len(prefix1), len(prefix2))
+        if prefix1[:n] == prefix2[:n]:
+            return n
+        low, high = 0, n    # prefix1[:low] == prefix2[:low] e prefix1[:high] != prefix2[:high]
+        while high - low > 1:
+            mid = (low + high) // 2
+            if prefix1[:mid] == prefix2[:mid]:
+                low = mid
+            else:
+                high = mid
+        return low
 
     def insert(self, word: bytes, code: int = None):
         """
-        Insere uma sequência de bytes (word) na trie compacta.
-        Se o limite de códigos for atingido, apenas retorne os códigos existentes.
+        Insere uma sequência de bytes (word) na trie compacta e retorna seu código.
+        Se o limite de códigos for atingido, apenas retorna o código existente (ou None).
         """
+        if not word:
+            return None
         if self.next_code >= self.max_code:
             return self.search(word)
 
-        current_node = self.root
+        node = self.root
         i = 0
-
         while i < len(word):
-            key = word[i:i+1]
+            child = self._child(node, word[i])
 
-            if key not in current_node.children:
-                new_node = Node(word[i:], isEndOfWord=True)
-                if code is not None:
-                    new_node.code = code
-                else:
-                    new_node.code = self.next_code
-                    self.next_code += 1
-                current_node.children[key] = new_node
-                return new_node.code
+            if child is None:
+                leaf = self._new_node(word[i:], self._next_code(code))
+                self._add_child(node, word[i], leaf)
+                return leaf.code
 
-            aux_node = current_node.children[key]
+            size = self.cpl(word[i:i + child.length], self._label(child))
+            if size < child.length:
+                self._split(child, size)
+            i += size
+            node = child
 
-            prefixSize = self.cpl(word[i:], aux_node.content)
+        # A palavra termina em um nó existente (ou no ponto de uma divisão).
+        if node.code is None:
+            node.code = self._next_code(code)
+        return node.code
 
-            if prefixSize == len(aux_node.content):
-                i += prefixSize
-                current_node = aux_node
-            else:
-                new_node = Node(aux_node.content[prefixSize:], isEndOfWord=aux_node.isEndOfWord, code=aux_node.code)
-                new_node.children = aux_node.children
-
-                aux_node.content = aux_node.content[:prefixSize]
-                aux_node.isEndOfWord = False
-                aux_node.code = None
-                aux_node.children = {new_node.content[0]: new_node}
-
-                if prefixSize < len(word[i:]):
-                    remaining_node = Node(word[i + prefixSize:], isEndOfWord=True)
-                    if code is not None:
-                        remaining_node.code = code
-                    else:
-                        remaining_node.code = self.next_code
-                        self.next_code += 1
-                    aux_node.children[remaining_node.content[0]] = remaining_node
-                    return remaining_node.code
-                else:
-                    aux_node.isEndOfWord = True
-                    if code is not None:
-                        aux_node.code = code
-                    else:
-                        aux_node.code = self.next_code
-                    self.next_code += 1
-                    return aux_node.code
-
-        if current_node.isEndOfWord and current_node.code is None:
-            if code is not None:
-                current_node.code = code
-            else:
-                current_node.code = self.next_code
-                self.next_code += 1
-
-        return current_node.code
-    
     def remove(self, word: bytes):
-        """Remove uma sequência de símbolos da trie."""
-        def _remove(node, word, index):
-            if index == len(word):
-                if node.isEndOfWord:
-                    node.isEndOfWord = False
-                    return len(node.children) == 0
-                return False
+        """Remove uma sequência de símbolos da trie, descartando os nós que ficarem sem uso."""
+        path = self._find(word) if word else None
+        if path is None or path[-1].code is None:
+            return
+
+        path[-1].code = None
+        for i in range(len(path) - 1, 0, -1):
+            node = path[i]
+            if node.code is not None or node.children:
+                break
+            self._remove_child(path[i - 1], self.labels[node.start])
+            if node.length == 1:
+                self.free_labels.append(node.start)
 
-            key = word[index:index + 1]
-            if key in node.children:
-                child_node = node.children[key]
-                should_remove = _remove(child_node, word, index + 1)
-
-                if should_remove:
-                    del node.children[key]
-                    return len(node.children) == 0 and not node.isEndOfWord
-            return False
-
-        _remove(self.root, word, 0)
-            
     def print_trie(self, node=None, level=0):
         if node is None:
             node = self.root
 
         indent = "  " * level
-        for label, child in node.children.items():
-            print(f"{indent}Content: {child.content}, Code: {child.code}, Is Full Word: {child.isEndOfWord}")
+        for child in self._children(node):
+            print(f"{indent}Content: {self._label(child)}, Code: {child.code}, Is Full Word: {child.isEndOfWord}")
             self.print_trie(child, level + 1)
-            
+
 class CompactTrie2(object):
     def __init__(self):
         # Mapeamento normal (onde chave é string e valor é int)
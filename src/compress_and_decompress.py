@@ -1,65 +1,567 @@
-import io, os
+import io, os, mmap, zlib, math, struct, bisect
+from collections import Counter
 
-def compress_file(input_file_path, lzw_compressor):
-    with open(input_file_path, 'rb') as f:
-        input_data = f.read()
+from packing import *
+from container import *
+from profiling import *
+from pipeline import *
+from entropy import *
+
+# Tamanho dos blocos lidos da entrada no modo streaming.
+CHUNK_SIZE = 1 << 16
+
+# Formato antigo, sem cabeçalho: o último byte do arquivo guarda max_bits. Com DICTIONARY_FLAG
+# ligado, os 4 bytes anteriores guardam o ID do dicionário treinado usado na compressão.
+DICTIONARY_FLAG = 0x80
+DICTIONARY_ID = struct.Struct("<I")
+
+def split_trailer(data):
+    """Separa o final de um arquivo no formato antigo. Retorna (corpo, max_bits, ID do dicionário ou None)."""
+    last = data[-1]
+    if not last & DICTIONARY_FLAG:
+        return data[:-1], last, None
+    end = len(data) - 1 - DICTIONARY_ID.size
+    return data[:end], last & ~DICTIONARY_FLAG, DICTIONARY_ID.unpack(data[end:-1])[0]
+
+def split_compressed(data):
+    """
+    Separa cabeçalho e fluxo de bits de um arquivo comprimido (bytes, mmap ou memoryview).
+    Retorna (FileHeader, corpo); no formato antigo o modo do cabeçalho é None (desconhecido).
+    """
+    if has_file_header(data):
+        return FileHeader.unpack(data[:FILE_HEADER.size]), data[FILE_HEADER.size:]
+    body, max_bits, dictionary_id = split_trailer(data)
+    return FileHeader(None, max_bits, dictionary_id), body
+
+def check_dictionary(dictionary_id, trained):
+    """Confere se o dicionário treinado informado é o mesmo usado na compressão."""
+    expected = trained.id if trained else None
+    if dictionary_id != expected:
+        if dictionary_id is None:
+            raise ValueError("O arquivo foi comprimido sem dicionário treinado")
+        raise ValueError(f"O arquivo foi comprimido com o dicionário {dictionary_id:08x}")
+
+def configure_decompressor(lzw_compressor, header):
+    """Ajusta o compressor ao que o cabeçalho informa (modo e max_bits) e confere o dicionário."""
+    check_dictionary(header.dictionary_id, lzw_compressor.dictionary)
+    if header.mode is not None:
+        lzw_compressor.variable_width = header.variable_width
+    lzw_compressor.entropy = header.entropy
+    lzw_compressor.eviction = "lru" if header.eviction else None
+    if header.max_bits != lzw_compressor.max_bits:
+        lzw_compressor.set_max_bits(header.max_bits)
+
+class OutputCheck:
+    """Acumula o tamanho e o CRC32 da saída decodificada e confere com o cabeçalho ao final."""
+    def __init__(self, header):
+        self.expected_length = header.original_length
+        self.expected_crc = header.crc
+        self.length = 0
+        self.crc = 0
+
+    def update(self, data):
+        self.length += len(data)
+        if self.expected_crc is not None:
+            self.crc = zlib.crc32(data, self.crc)
+
+    def finish(self):
+        if self.expected_length is not None and self.length != self.expected_length:
+            raise ValueError(f"Arquivo corrompido: {self.length} bytes decodificados, {self.expected_length} esperados")
+        if self.expected_crc is not None and self.crc != self.expected_crc:
+            raise ValueError("Arquivo corrompido: CRC32 diferente do cabeçalho")
+
+def map_file(f):
+    """
+    Mapeia o arquivo aberto em memória e retorna um memoryview somente leitura (sem cópia).
+    O mapeamento é liberado quando não houver mais referências ao memoryview ou às suas fatias.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        return memoryview(b"")
+    return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+# Blocos com entropia estimada (bits por byte, ordem 0) a partir deste valor são guardados sem
+# passar pelo LZW, que nesses dados sempre expande (ex.: mídia já comprimida, dados cifrados).
+STORED_ENTROPY = 7.5
+
+# A estimativa usa um byte a cada ENTROPY_SAMPLE_STEP do bloco.
+ENTROPY_SAMPLE_STEP = 16
+
+def estimate_entropy(data, step=ENTROPY_SAMPLE_STEP):
+    """Entropia de ordem 0 (bits por byte) de uma amostra espaçada de data."""
+    sample = bytes(data[::step])
+    if not sample:
+        return 0.0
+    n = len(sample)
+    return -sum(count / n * math.log2(count / n) for count in Counter(sample).values())
+
+def _reset_schedule(coder):
+    """Volta a largura dos códigos de um (des)empacotador ao início, se ela for variável."""
+    schedule = getattr(coder, "schedule", None)
+    if schedule is not None:
+        schedule.reset()
+
+class FrameDecoder:
+    """
+    Decodificação do corpo em blocos (FLAG_STORED) em duas etapas, como unpack() e
+    decompress_chunk() no fluxo simples: unpack() separa os blocos completos dos bytes
+    recebidos e desempacota os códigos dos blocos LZW; decode() decodifica esses blocos e copia
+    os guardados diretamente para a saída.
+    """
+    def __init__(self, lzw_compressor, unpacker):
+        self.lzw = lzw_compressor
+        self.unpacker = unpacker
+        self.buffer = bytearray()
+
+    def unpack(self, data):
+        self.buffer += data
+        buffer = self.buffer
+        frames = []
+        pos = 0
+        while len(buffer) - pos >= FRAME_HEADER.size:
+            kind, length = FRAME_HEADER.unpack_from(buffer, pos)
+            start = pos + FRAME_HEADER.size
+            if start + length > len(buffer):
+                break
+            payload = bytes(buffer[start:start + length])
+            pos = start + length
+            if kind == FRAME_LZW:
+                frames.append((kind, self.unpacker.unpack(payload)))
+                reader = getattr(self.unpacker, "reader", None)
+                if reader is not None:
+                    reader.align()
+            elif kind in (FRAME_STORED, FRAME_STORED_RESET):
+                if kind == FRAME_STORED_RESET:
+                    _reset_schedule(self.unpacker)
+                frames.append((kind, payload))
+            else:
+                raise ValueError(f"Tipo de bloco desconhecido: {kind}")
+        del buffer[:pos]
+        return frames
+
+    def decode(self, frames):
+        output = []
+        for kind, data in frames:
+            if kind == FRAME_LZW:
+                output.append(self.lzw.decompress_chunk(data))
+                self.lzw.decoder.end_sequence()
+            else:
+                if kind == FRAME_STORED_RESET:
+                    self.lzw.decoder.reset()
+                output.append(data)
+        return b"".join(output)
+
+class LZWWriter:
+    """
+    Objeto-arquivo de escrita: grava o cabeçalho, comprime os bytes recebidos em write() e grava
+    os códigos empacotados à medida que são gerados. close() grava o último código e, se a saída
+    permitir seek, completa o cabeçalho com o tamanho original e o CRC32 (o arquivo de saída não
+    é fechado). Com index_interval, reinicia o dicionário a cada index_interval bytes da entrada
+    e grava ao final o índice desses pontos, usado por decompress_range.
+    Com header_pos, a compressão é retomada (ver snapshot.py): o cabeçalho já está gravado nessa
+    posição e o estado do compressor e do empacotador é restaurado por quem cria o objeto.
+    Com stored_blocks, a saída é dividida em blocos de STORED_BLOCK_SIZE bytes da entrada (ver
+    FLAG_STORED): os de entropia alta são guardados sem compressão, e os que o LZW expandiria
+    também, com o dicionário reiniciado.
+    """
+    def __init__(self, fileobj, lzw_compressor, index_interval=None, header_pos=None, stored_blocks=False):
+        self.fileobj = fileobj
+        self.lzw = lzw_compressor
+        self.packer = lzw_compressor.make_packer()
+        self.closed = False
+        self.length = 0
+        self.crc = 0
+
+        if index_interval and lzw_compressor.entropy:
+            raise ValueError("O índice de acesso aleatório não pode ser usado com a codificação de entropia")
+        if index_interval and stored_blocks:
+            raise ValueError("O índice de acesso aleatório não pode ser usado com os blocos guardados")
+        self.index_interval = index_interval
+        self.index = [(0, 0)] if index_interval else None
+        self.next_restart = index_interval
+        self.stored_blocks = stored_blocks
+        self.block = bytearray()    # entrada ainda sem bloco completo
+        self.body_bytes = 0         # bytes gravados depois do cabeçalho (com stored_blocks)
+
+        trained = lzw_compressor.dictionary
+        self.header = FileHeader(MODE_VARIABLE if lzw_compressor.variable_width else MODE_FIXED,
+                                 lzw_compressor.max_bits, trained.id if trained else None,
+                                 indexed=self.index is not None, entropy=lzw_compressor.entropy,
+                                 eviction=lzw_compressor.eviction_policy is not None, stored=stored_blocks)
+        if header_pos is not None:
+            self.header_pos = header_pos
+            return
+        self.header_pos = fileobj.tell() if fileobj.seekable() else None
+        fileobj.write(self.header.pack())
+        self.lzw.begin_compress()
+
+    def _compress(self, data):
+        self.length += len(data)
+        prof = get_profiler()
+        if prof:
+            prof.switch("busca_insercao")
+        codes = self.lzw.compress_chunk(data)
+        if prof:
+            prof.switch("empacotamento")
+        packed = self.packer.pack(codes)
+        if prof:
+            prof.switch("escrita")
+        self.fileobj.write(packed)
+        if prof:
+            prof.switch(None)
+            prof.count("bytes_entrada", len(data))
+            prof.count("codigos", len(codes))
+
+    def _write_frame(self, kind, payload):
+        self.fileobj.write(FRAME_HEADER.pack(kind, len(payload)))
+        self.fileobj.write(payload)
+        self.body_bytes += FRAME_HEADER.size + len(payload)
+
+    def _compress_block(self, block):
+        """Grava um bloco da entrada como bloco LZW ou, se o LZW não compensar, guardado."""
+        self.length += len(block)
+        stats = self.lzw.stats
+        prof = get_profiler()
+        if prof:
+            prof.switch("estimativa_entropia")
+        if estimate_entropy(block) >= STORED_ENTROPY:
+            # Nem passa pelo LZW: o dicionário segue como estava.
+            stats["tamanho_original"] += len(block)
+            stats["blocos_guardados"] += 1
+            if prof:
+                prof.switch("escrita")
+            self._write_frame(FRAME_STORED, block)
+            if prof:
+                prof.switch(None)
+                prof.count("bytes_entrada", len(block))
+            return
 
-    compressed_codes = lzw_compressor.compress(input_data)
+        if prof:
+            prof.switch("busca_insercao")
+        codes = self.lzw.compress_chunk(block)
+        codes.extend(self.lzw.finish_compress())
+        if prof:
+            prof.switch("empacotamento")
+        packed = self.packer.pack(codes) + self.packer.flush()
+        if prof:
+            prof.switch("escrita")
+        if len(packed) < len(block):
+            self._write_frame(FRAME_LZW, packed)
+        else:
+            # O dicionário aprendeu com dados que o decodificador não vai ver: ambos reiniciam.
+            self.lzw.reset_dictionary()
+            _reset_schedule(self.packer)
+            stats["blocos_guardados"] += 1
+            self._write_frame(FRAME_STORED_RESET, block)
+        if prof:
+            prof.switch(None)
+            prof.count("bytes_entrada", len(block))
+            prof.count("codigos", len(codes))
 
-    bit_stream = io.BytesIO()
+    def write(self, data):
+        size = len(data)
+        self.crc = zlib.crc32(data, self.crc)
+        if self.stored_blocks:
+            # Blocos de tamanho fixo, qualquer que seja o tamanho das escritas.
+            start = 0
+            if self.block:
+                start = min(STORED_BLOCK_SIZE - len(self.block), len(data))
+                self.block += data[:start]
+                if len(self.block) < STORED_BLOCK_SIZE:
+                    return size
+                self._compress_block(bytes(self.block))
+                self.block = bytearray()
+            end = start + (len(data) - start) // STORED_BLOCK_SIZE * STORED_BLOCK_SIZE
+            for offset in range(start, end, STORED_BLOCK_SIZE):
+                self._compress_block(data[offset:offset + STORED_BLOCK_SIZE])
+            self.block += data[end:]
+            return size
+        if self.index is not None:
+            # Só há ponto de reinício se a entrada continua depois dele.
+            while self.length + len(data) > self.next_restart:
+                n = self.next_restart - self.length
+                self._compress(data[:n])
+                data = data[n:]
+                self.fileobj.write(self.packer.pack(self.lzw.restart()))
+                self.index.append((self.length, self.packer.writer.total_bits))
+                self.next_restart += self.index_interval
+        self._compress(data)
+        return size
 
-    buffer = 0
-    bits_in_buffer = 0
-    for code in compressed_codes:
-        buffer |= (code << bits_in_buffer)
-        bits_in_buffer += lzw_compressor.get_bits_for_code()
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
 
-        while bits_in_buffer >= 8:
-            bit_stream.write(bytes([buffer & 0xFF]))
-            buffer >>= 8
-            bits_in_buffer -= 8
+        if self.stored_blocks:
+            codes = []
+            if self.block:
+                self._compress_block(bytes(self.block))
+                self.block = bytearray()
+            self.lzw.update_compress_stats(8 * (self.body_bytes + FILE_HEADER.size))
+        else:
+            codes = self.lzw.finish_compress()
+            self.fileobj.write(self.packer.pack(codes))
+            self.fileobj.write(self.packer.flush())
+            extra = FILE_HEADER.size
+            if self.index is not None:
+                seek_index = pack_seek_index(self.index)
+                self.fileobj.write(seek_index)
+                extra += len(seek_index)
+            self.lzw.update_compress_stats(self.packer.writer.total_bits + 8 * extra)
 
-    if bits_in_buffer > 0:
-        bit_stream.write(bytes([buffer & 0xFF]))
+        prof = get_profiler()
+        if prof:
+            prof.count("codigos", len(codes))
+            prof.count("entradas_criadas", self.lzw.stats["entradas_criadas"])
+            prof.count("limpezas", self.lzw.stats["clears"])
+            prof.count("blocos_guardados", self.lzw.stats["blocos_guardados"])
+            prof.count("divisoes_de_no", getattr(self.lzw.trie, "splits", 0))
+            prof.count("transicoes_de_largura", getattr(getattr(self.packer, "schedule", None), "transitions", 0))
+            prof.mark("dicionario_cheio_em", self.lzw.stats["dictionary_full_at"])
 
-    bit_stream.write(bytes([lzw_compressor.max_bits]))
+        if self.header_pos is not None:
+            self.header.original_length = self.length
+            self.header.crc = self.crc
+            end = self.fileobj.tell()
+            self.fileobj.seek(self.header_pos)
+            self.fileobj.write(self.header.pack())
+            self.fileobj.seek(end)
 
-    base_name = os.path.basename(input_file_path)
-    compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
+    def __enter__(self):
+        return self
 
-    with open(compressed_file_path, 'wb') as f:
-        f.write(bit_stream.getvalue())
+    def __exit__(self, *exc):
+        self.close()
+
+class LZWReader:
+    """
+    Objeto-arquivo de leitura: desempacota e decodifica o arquivo comprimido aos poucos.
+    Iterar sobre o leitor produz os blocos descomprimidos. A origem pode ser um arquivo que
+    permita seek ou um buffer (bytes, mmap, memoryview), cujas fatias são lidas sem cópia.
+    Modo, max_bits e dicionário vêm do cabeçalho; tamanho e CRC32 são conferidos ao final.
+    """
+    def __init__(self, source, lzw_compressor, chunk_size=CHUNK_SIZE):
+        self.lzw = lzw_compressor
+        self.chunk_size = chunk_size
+
+        if hasattr(source, 'read'):
+            self.fileobj = source
+            self.view = None
+
+            start = source.tell()
+            end = source.seek(0, io.SEEK_END)
+            source.seek(start)
+            first = source.read(FILE_HEADER.size)
+            if has_file_header(first):
+                header = FileHeader.unpack(first)
+                self.remaining = end - start - FILE_HEADER.size
+                if header.indexed:
+                    source.seek(end - SEEK_FOOTER.size)
+                    self.remaining -= seek_index_size(source.read(SEEK_FOOTER.size))
+                    source.seek(start + FILE_HEADER.size)
+            else:
+                source.seek(max(start, end - 1 - DICTIONARY_ID.size))
+                tail = source.read()
+                body, max_bits, dictionary_id = split_trailer(tail)
+                header = FileHeader(None, max_bits, dictionary_id)
+                self.remaining = end - start - (len(tail) - len(body))
+                source.seek(start)
+        else:
+            self.fileobj = None
+            header, self.view = split_compressed(memoryview(source))
+            if header.indexed:
+                self.view, _ = split_seek_index(self.view)
+            self.offset = 0
+            self.remaining = len(self.view)
+
+        configure_decompressor(lzw_compressor, header)
+        self.header = header
+        self.check = OutputCheck(header)
+        self.unpacker = lzw_compressor.make_unpacker()
+        # Etapas de desempacotamento e decodificação (blocos ou fluxo simples).
+        if header.stored:
+            frames = FrameDecoder(lzw_compressor, self.unpacker)
+            self._unpack, self._decode = frames.unpack, frames.decode
+        else:
+            self._unpack, self._decode = self.unpacker.unpack, lzw_compressor.decompress_chunk
+        self.pending = b""
+        self.lzw.begin_decompress()
+
+    def _read_input(self, size):
+        if self.view is None:
+            return self.fileobj.read(size)
+        data = self.view[self.offset:self.offset + size]
+        self.offset += len(data)
+        return data
+
+    def read_chunk(self):
+        """Retorna o próximo bloco descomprimido, ou b"" ao final do arquivo."""
+        prof = get_profiler()
+        while self.remaining > 0:
+            if prof:
+                prof.switch("leitura")
+            data = self._read_input(min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+
+            if prof:
+                prof.switch("desempacotamento")
+            codes = self._unpack(data)
+            if prof:
+                prof.switch("decodificacao")
+                prof.count("blocos" if self.header.stored else "codigos", len(codes))
+            decoded = self._decode(codes)
+            self.check.update(decoded)
+            if prof:
+                prof.switch(None)
+                prof.count("bytes_saida", len(decoded))
+            if decoded:
+                return decoded
+
+        if prof:
+            prof.switch(None)
+
+        if self.check is not None:
+            self.check.finish()
+            self.check = None
+        return b""
+
+    def pipelined(self, depth=PIPELINE_DEPTH):
+        """
+        Gera os blocos descomprimidos como a iteração sobre o leitor, mas com leitura e
+        desempacotamento em uma thread e decodificação em outra, ligadas por filas de até depth
+        trechos: quem consome os blocos (ex.: a escrita da saída) roda junto com elas.
+        """
+        def read():
+            while self.remaining > 0:
+                data = self._read_input(min(self.chunk_size, self.remaining))
+                if not data:
+                    break
+                self.remaining -= len(data)
+                yield data
+
+        def decode(codes):
+            decoded = self._decode(codes)
+            self.check.update(decoded)
+            return decoded
+
+        for decoded in run_pipeline(read(), [self._unpack, decode], depth):
+            if decoded:
+                yield decoded
+        self.check.finish()
+        self.check = None
+
+    def read(self, size=-1):
+        if size < 0 and self.check is not None and self.check.expected_length is not None:
+            # Tamanho conhecido pelo cabeçalho: a saída é alocada uma única vez.
+            output = bytearray(self.check.expected_length - self.check.length + len(self.pending))
+            pos = 0
+            for chunk in self:
+                output[pos:pos + len(chunk)] = chunk
+                pos += len(chunk)
+            return output
+
+        chunks = [self.pending]
+        total = len(self.pending)
+
+        while size < 0 or total < size:
+            chunk = self.read_chunk()
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+
+        data = b"".join(chunks)
+        if size < 0:
+            self.pending = b""
+            return data
+        self.pending = data[size:]
+        return data[:size]
+
+    def __iter__(self):
+        if self.pending:
+            yield self.pending
+            self.pending = b""
+        while True:
+            chunk = self.read_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+def compress_file(input_file_path, lzw_compressor, compressed_file_path=None, index_interval=None, stored_blocks=False):
+    if compressed_file_path is None:
+        base_name = os.path.basename(input_file_path)
+        compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
+
+    prof = get_profiler()
+    if prof:
+        prof.switch("leitura")
+    with open(input_file_path, 'rb') as f:
+        input_data = map_file(f)
+    if prof:
+        prof.switch(None)
+
+    with open(compressed_file_path, 'wb') as output_file:
+        with LZWWriter(output_file, lzw_compressor, index_interval, stored_blocks=stored_blocks) as writer:
+            for offset in range(0, len(input_data), CHUNK_SIZE):
+                writer.write(input_data[offset:offset + CHUNK_SIZE])
 
     print(f"Arquivo comprimido gerado: {compressed_file_path}")
     return compressed_file_path
 
 def decompress_file(input_file_path, output_file_path, lzw_compressor):
     with open(input_file_path, 'rb') as f:
-        compressed_data = f.read()
+        compressed_data = map_file(f)
 
-    initial_bits = compressed_data[-1]
-    compressed_codes = []
-    buffer = 0
-    bits_in_buffer = 0
+    # Com o profiler ativo a descompressão é sequencial, para que os tempos por fase não se misturem.
+    prof = get_profiler()
+    reader = LZWReader(compressed_data, lzw_compressor)
+    with open(output_file_path, 'wb') as output_file:
+        for chunk in reader.pipelined() if pipeline_enabled() and not prof else reader:
+            if prof:
+                prof.switch("escrita")
+            output_file.write(chunk)
+            if prof:
+                prof.switch(None)
 
-    bit_stream = io.BytesIO(compressed_data[0:-1])
+    print(f"Arquivo descomprimido gerado: {output_file_path}")
+
+def decompress_range(input_file_path, start, length, lzw_compressor):
+    """
+    Descomprime apenas os bytes [start, start + length) de um arquivo gravado com índice de
+    acesso aleatório: a decodificação começa no último ponto de reinício antes de start e para
+    assim que o trecho pedido estiver completo. O CRC32 do arquivo inteiro não é conferido.
+    """
+    with open(input_file_path, 'rb') as f:
+        data = map_file(f)
 
-    while True:
-        byte = bit_stream.read(1)
-        if not byte:
-            break
-        buffer |= ord(byte) << bits_in_buffer
-        bits_in_buffer += 8
+    header, body = split_compressed(data)
+    if not header.indexed:
+        raise ValueError("O arquivo não tem índice de acesso aleatório")
+    body, index = split_seek_index(body)
+    configure_decompressor(lzw_compressor, header)
 
-        while bits_in_buffer >= initial_bits:
-            code = buffer & ((1 << initial_bits) - 1)
-            compressed_codes.append(code)
-            buffer >>= initial_bits
-            bits_in_buffer -= initial_bits
+    point = bisect.bisect_right(index, (start, float('inf'))) - 1
+    offset, bit_offset = index[point]
 
-    decompressed_data = lzw_compressor.decompress(compressed_codes)
+    unpacker = lzw_compressor.make_unpacker()
+    lzw_compressor.begin_decompress()
+    pos = bit_offset // 8
+    if pos < len(body):
+        # O ponto pode cair no meio de um byte: lê esse byte e descarta os bits anteriores.
+        unpacker.reader.feed(body[pos:pos + 1])
+        unpacker.reader.skip(bit_offset % 8)
+        pos += 1
 
-    with open(output_file_path, 'wb') as f:
-        f.write(decompressed_data)
+    chunks = []
+    decoded = offset
+    end = start + length
+    while decoded < end and pos < len(body):
+        chunk = lzw_compressor.decompress_chunk(unpacker.unpack(body[pos:pos + CHUNK_SIZE]))
+        pos += CHUNK_SIZE
+        chunks.append(chunk)
+        decoded += len(chunk)
 
-    print(f"Arquivo descomprimido gerado: {output_file_path}")
\ No newline at end of file
+    result = b"".join(chunks)
+    return result[start - offset:end - offset]
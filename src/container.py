@@ -0,0 +1,222 @@
+import os
+import struct
+
+# Cabeçalho dos arquivos de fluxo único (compress_file e LZW_not_fixed_compress), seguido
+# diretamente pelo fluxo de bits. O tamanho original e o CRC32 são gravados ao final da
+# compressão quando a saída permite seek; sem eles, os flags correspondentes ficam desligados.
+FILE_MAGIC = b"LZWF"
+FILE_VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sBBBBIQI")  # magic, versão, modo, max_bits, flags, ID do dicionário, tamanho original, CRC32
+
+MODE_FIXED = 0          # classe LZW, códigos de max_bits bits
+MODE_VARIABLE = 1       # classe LZW com largura crescente (mesmo formato do modo dinâmico)
+MODE_DYNAMIC = 2        # LZW_not_fixed_compress
+MODE_NAMES = {MODE_FIXED: "fixo", MODE_VARIABLE: "variável", MODE_DYNAMIC: "dinâmico"}
+
+FLAG_DICTIONARY = 1     # comprimido com o dicionário treinado de ID indicado
+FLAG_LENGTH = 2         # tamanho original presente
+FLAG_CRC = 4            # CRC32 da entrada presente
+FLAG_INDEX = 8          # índice de acesso aleatório gravado depois do fluxo de bits
+FLAG_ENTROPY = 16       # códigos em blocos com codificação de entropia (entropy.py)
+FLAG_EVICTION = 32      # dicionário cheio com descarte LRU (eviction.py)
+FLAG_STORED = 64        # corpo em blocos, os incompressíveis guardados sem compressão
+
+# Blocos do corpo com FLAG_STORED: tipo e tamanho, seguidos do conteúdo. Um bloco LZW traz os
+# códigos de até STORED_BLOCK_SIZE bytes da entrada, terminando na sequência pendente, com o
+# último byte completado com zeros; o dicionário continua no bloco seguinte. Um bloco guardado
+# traz os bytes da entrada; no tipo com reinício, o dicionário e a largura dos códigos voltam
+# ao início antes do bloco seguinte (o compressor testou o bloco, que expandiria).
+FRAME_HEADER = struct.Struct("<BI")    # tipo, bytes do conteúdo
+FRAME_LZW = 0
+FRAME_STORED = 1
+FRAME_STORED_RESET = 2
+STORED_BLOCK_SIZE = 1 << 16
+
+class FileHeader:
+    def __init__(self, mode, max_bits, dictionary_id=None, original_length=None, crc=None, indexed=False,
+                 entropy=False, eviction=False, stored=False):
+        self.mode = mode
+        self.max_bits = max_bits
+        self.dictionary_id = dictionary_id
+        self.original_length = original_length
+        self.crc = crc
+        self.indexed = indexed
+        self.entropy = entropy
+        self.eviction = eviction
+        self.stored = stored
+
+    @property
+    def variable_width(self):
+        return self.mode != MODE_FIXED
+
+    def pack(self):
+        flags = ((FLAG_DICTIONARY if self.dictionary_id is not None else 0) |
+                 (FLAG_LENGTH if self.original_length is not None else 0) |
+                 (FLAG_CRC if self.crc is not None else 0) |
+                 (FLAG_INDEX if self.indexed else 0) |
+                 (FLAG_ENTROPY if self.entropy else 0) |
+                 (FLAG_EVICTION if self.eviction else 0) |
+                 (FLAG_STORED if self.stored else 0))
+        return FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.mode, self.max_bits, flags,
+                                self.dictionary_id or 0, self.original_length or 0, self.crc or 0)
+
+    @classmethod
+    def unpack(cls, data):
+        magic, version, mode, max_bits, flags, dictionary_id, original_length, crc = FILE_HEADER.unpack(data)
+        if magic != FILE_MAGIC:
+            raise ValueError("Arquivo não tem o cabeçalho LZW")
+        if version != FILE_VERSION:
+            raise ValueError(f"Versão de arquivo não suportada: {version}")
+        if mode not in MODE_NAMES:
+            raise ValueError(f"Modo desconhecido: {mode}")
+        return cls(mode, max_bits,
+                   dictionary_id if flags & FLAG_DICTIONARY else None,
+                   original_length if flags & FLAG_LENGTH else None,
+                   crc if flags & FLAG_CRC else None,
+                   bool(flags & FLAG_INDEX),
+                   bool(flags & FLAG_ENTROPY),
+                   bool(flags & FLAG_EVICTION),
+                   bool(flags & FLAG_STORED))
+
+def has_file_header(data):
+    return bytes(data[:len(FILE_MAGIC)]) == FILE_MAGIC and len(data) >= FILE_HEADER.size
+
+# Índice de acesso aleatório: nos pontos de reinício o compressor emite o código de limpeza,
+# então a decodificação pode começar em qualquer um deles com o dicionário inicial. O índice
+# fica depois do fluxo de bits e termina com um rodapé de tamanho fixo, lido a partir do fim.
+SEEK_MAGIC = b"LZWI"
+SEEK_ENTRY = struct.Struct("<QQ")      # posição na entrada, posição em bits no fluxo (após o cabeçalho)
+SEEK_FOOTER = struct.Struct("<I4s")    # número de pontos, magic
+
+def pack_seek_index(entries):
+    return b"".join(SEEK_ENTRY.pack(*entry) for entry in entries) + SEEK_FOOTER.pack(len(entries), SEEK_MAGIC)
+
+def seek_index_size(footer):
+    """Tamanho total do índice (pontos + rodapé) a partir dos últimos SEEK_FOOTER.size bytes do arquivo."""
+    count, magic = SEEK_FOOTER.unpack(footer)
+    if magic != SEEK_MAGIC:
+        raise ValueError("Índice de acesso aleatório corrompido")
+    return count * SEEK_ENTRY.size + SEEK_FOOTER.size
+
+def split_seek_index(body):
+    """Separa o fluxo de bits e o índice. Retorna (fluxo, lista de (posição na entrada, posição em bits))."""
+    if len(body) < SEEK_FOOTER.size:
+        raise ValueError("Índice de acesso aleatório corrompido")
+    size = seek_index_size(body[-SEEK_FOOTER.size:])
+    if size > len(body):
+        raise ValueError("Índice de acesso aleatório corrompido")
+    start = len(body) - size
+    entries = [SEEK_ENTRY.unpack_from(body, start + i * SEEK_ENTRY.size)
+               for i in range((size - SEEK_FOOTER.size) // SEEK_ENTRY.size)]
+    return body[:start], entries
+
+# Contêiner em blocos: cabeçalho, índice de blocos e os fluxos de bits de cada bloco.
+# Cada bloco é comprimido com um dicionário novo (o dicionário treinado, se houver), então pode
+# ser decodificado isoladamente.
+BLOCK_MAGIC = b"LZWB"
+BLOCK_VERSION = 3
+
+BLOCK_HEADER = struct.Struct("<4sBBI")     # magic, versão, max_bits, número de blocos
+BLOCK_DICTIONARY = struct.Struct("<BI")    # versão 3: flags (FLAG_DICTIONARY), ID do dicionário
+BLOCK_ENTRY = struct.Struct("<QQQI")       # offset no arquivo, tamanho original, tamanho comprimido, CRC32 do bloco
+BLOCK_ENTRY_V1 = struct.Struct("<QQQ")     # versão 1: sem CRC
+
+def is_block_container(file_path):
+    """Verifica se o arquivo começa com o cabeçalho do contêiner em blocos."""
+    with open(file_path, 'rb') as f:
+        return f.read(len(BLOCK_MAGIC)) == BLOCK_MAGIC
+
+def index_size(num_blocks):
+    return BLOCK_HEADER.size + BLOCK_DICTIONARY.size + num_blocks * BLOCK_ENTRY.size
+
+def write_block_index(f, max_bits, entries, dictionary_id=None):
+    """
+    Grava cabeçalho e índice na posição atual. entries: lista de (offset, tamanho original,
+    tamanho comprimido, CRC32); dictionary_id: ID do dicionário treinado dos blocos, se houver.
+    """
+    f.write(BLOCK_HEADER.pack(BLOCK_MAGIC, BLOCK_VERSION, max_bits, len(entries)))
+    f.write(BLOCK_DICTIONARY.pack(FLAG_DICTIONARY if dictionary_id is not None else 0, dictionary_id or 0))
+    for entry in entries:
+        f.write(BLOCK_ENTRY.pack(*entry))
+
+def read_block_index(f):
+    """
+    Lê cabeçalho e índice. Retorna (max_bits, entries, ID do dicionário ou None); na versão 1
+    o CRC dos blocos é None.
+    """
+    magic, version, max_bits, num_blocks = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+    if magic != BLOCK_MAGIC:
+        raise ValueError("Arquivo não é um contêiner LZW em blocos")
+    if version not in (1, 2, BLOCK_VERSION):
+        raise ValueError(f"Versão de contêiner não suportada: {version}")
+
+    dictionary_id = None
+    if version >= 3:
+        flags, dictionary_id = BLOCK_DICTIONARY.unpack(f.read(BLOCK_DICTIONARY.size))
+        if not flags & FLAG_DICTIONARY:
+            dictionary_id = None
+    entry = BLOCK_ENTRY if version >= 2 else BLOCK_ENTRY_V1
+    data = f.read(num_blocks * entry.size)
+    entries = [entry.unpack_from(data, i * entry.size) for i in range(num_blocks)]
+    if version == 1:
+        entries = [e + (None,) for e in entries]
+    return max_bits, entries, dictionary_id
+
+def read_info(file_path):
+    """
+    Descreve um arquivo .lzw lendo apenas o cabeçalho (ou, no formato antigo sem cabeçalho,
+    apenas o final do arquivo). Retorna um dicionário com os campos conhecidos.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        start = f.read(FILE_HEADER.size)
+        if start[:len(BLOCK_MAGIC)] == BLOCK_MAGIC:
+            f.seek(0)
+            try:
+                max_bits, entries, dictionary_id = read_block_index(f)
+            except struct.error:
+                return {"formato": "vazio/corrompido", "tamanho_comprimido": size}
+            return {
+                "formato": "blocos",
+                "max_bits": max_bits,
+                "blocos": len(entries),
+                "dicionario": f"{dictionary_id:08x}" if dictionary_id is not None else None,
+                "tamanho_original": sum(e[1] for e in entries),
+                "tamanho_comprimido": size,
+                "crc_por_bloco": all(e[3] is not None for e in entries),
+            }
+        if has_file_header(start):
+            header = FileHeader.unpack(start)
+            return {
+                "formato": "fluxo único",
+                "modo": MODE_NAMES[header.mode],
+                "max_bits": header.max_bits,
+                "dicionario": f"{header.dictionary_id:08x}" if header.dictionary_id is not None else None,
+                "tamanho_original": header.original_length,
+                "tamanho_comprimido": size,
+                "crc32": f"{header.crc:08x}" if header.crc is not None else None,
+                "entropia": header.entropy,
+                "descarte": "lru" if header.eviction else None,
+                "blocos_guardados": header.stored,
+                "pontos_de_acesso": _seek_points(f, header),
+            }
+        if size == 0 or (start[:len(FILE_MAGIC)] == FILE_MAGIC and size < FILE_HEADER.size):
+            return {"formato": "vazio/corrompido", "tamanho_comprimido": size}
+        f.seek(-1, os.SEEK_END)
+        return {
+            "formato": "antigo (sem cabeçalho)",
+            "max_bits": f.read(1)[0] & 0x7F,
+            "tamanho_comprimido": size,
+        }
+
+def _seek_points(f, header):
+    if not header.indexed:
+        return None
+    f.seek(-SEEK_FOOTER.size, os.SEEK_END)
+    return SEEK_FOOTER.unpack(f.read(SEEK_FOOTER.size))[0]
+
+def print_info(file_path):
+    print(f"{file_path}:")
+    for key, value in read_info(file_path).items():
+        print(f" - {key}: {value if value is not None else '-'}")
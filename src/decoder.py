@@ -0,0 +1,254 @@
+# Frases de um byte pré-alocadas: o dicionário inicial de toda decodificação.
+BYTE_PHRASES = [bytes([i]) for i in range(256)]
+
+# Limite (bytes) para a soma das frases do dicionário. Abaixo dele toda entrada é uma frase
+# pronta; acima (frases muito longas, como em grandes trechos repetidos), as entradas novas com
+# mais de LONG_PHRASE bytes passam a ser guardadas só como (código do prefixo, último byte).
+DECODER_MEMORY = 1 << 25
+LONG_PHRASE = 256
+
+# Acima do limite, uma a cada PHRASE_STRIDE entradas de uma mesma cadeia de prefixos ainda é
+# guardada pronta: refazer uma frase percorre no máximo esse número de ligações.
+PHRASE_STRIDE = 64
+
+class LZWDecoder:
+    """
+    Decodificador LZW compartilhado pelos modos fixo e dinâmico.
+    O dicionário é uma lista indexada pelo código (sem hash por consulta) e a saída de cada
+    trecho é reunida em uma lista de frases e unida uma única vez com b"".join, que aloca o
+    resultado já com o tamanho final. A memória das frases é limitada por DECODER_MEMORY.
+    """
+    def __init__(self, max_code, clear_code=None, initial=None, eviction=None):
+        # Códigos a partir de max_code nunca entram no dicionário.
+        self.max_code = max_code
+        self.clear_code = clear_code
+        # Frases iniciais: as 256 de um byte, ou as de um dicionário treinado.
+        self.initial = initial if initial is not None else BYTE_PHRASES
+        # Política de descarte (ver eviction.py), espelhando as decisões do compressor.
+        self.eviction = eviction
+        self.reset()
+
+    def reset(self):
+        """Volta o dicionário às entradas iniciais."""
+        self.phrases = self.initial[:]
+        self.prefixo = None
+        self.prefix_code = None
+        # Acima de DECODER_MEMORY: código -> (código do prefixo, último byte, ligações até uma
+        # frase pronta). As entradas com 0 ligações têm frase pronta em self.phrases.
+        self.links = None
+        # Bytes decodificados desde o reinício e ponto da próxima conferência do limite: a soma
+        # das frases cresce no máximo um byte por byte decodificado.
+        self.produced = 0
+        self.next_check = DECODER_MEMORY
+        if self.eviction is not None:
+            self.eviction.reset()
+
+    def end_sequence(self):
+        """Fim de uma sequência do compressor (finish_compress): o próximo código não gera entrada."""
+        self.prefixo = None
+        self.prefix_code = None
+
+    def phrase(self, code):
+        """Frase atual do código."""
+        phrase = self.phrases[code]
+        return phrase if phrase is not None else self._rebuild(code)
+
+    def _rebuild(self, code):
+        """Refaz a frase de uma entrada guardada como ligação, subindo até uma frase pronta."""
+        phrases = self.phrases
+        links = self.links
+        tail = bytearray()
+        while phrases[code] is None:
+            code, last, _ = links[code]
+            tail.append(last)
+        tail.reverse()
+        return phrases[code] + tail
+
+    def _add(self, code, prefixo, prefix_code, last):
+        """Frase (ou None, se virou ligação) da entrada `code` = prefixo + last, acima do limite."""
+        links = self.links
+        # Sem o código do prefixo (primeira entrada depois de passar do limite), frase pronta.
+        if len(prefixo) < LONG_PHRASE or prefix_code is None:
+            links.pop(code, None)
+            return prefixo + last
+        parent = links.get(prefix_code)
+        distance = parent[2] + 1 if parent is not None else 1
+        if distance >= PHRASE_STRIDE:
+            links[code] = (prefix_code, last[0], 0)
+            return prefixo + last
+        links[code] = (prefix_code, last[0], distance)
+        return None
+
+    def _check_memory(self, output):
+        """Depois de cada trecho: passa a guardar ligações se as frases atingiram o limite."""
+        self.produced += len(output)
+        if self.links is None and self.produced >= self.next_check:
+            stored = sum(len(phrase) for phrase in self.phrases)
+            if stored >= DECODER_MEMORY:
+                self.links = {}
+            else:
+                self.next_check = self.produced + DECODER_MEMORY - stored
+        return output
+
+    def decode(self, codes):
+        """Decodifica um trecho da sequência de códigos, mantendo o dicionário entre chamadas."""
+        if self.eviction is not None:
+            return self._check_memory(self._decode_evicting(codes))
+        if self.links is not None:
+            return self._check_memory(self._decode_bounded(iter(codes)))
+        return self._check_memory(self._decode(codes))
+
+    def _decode(self, codes):
+        phrases = self.phrases
+        add = phrases.append
+        size = len(phrases)
+        max_code = self.max_code
+        clear_code = self.clear_code
+        prefixo = self.prefixo
+
+        output = []
+        write = output.append
+        for codigo in codes:
+            if codigo < size:
+                entry = phrases[codigo]
+            elif codigo == clear_code:
+                self.reset()
+                phrases = self.phrases
+                add = phrases.append
+                size = len(phrases)
+                prefixo = None
+                continue
+            elif codigo == size and prefixo is not None:
+                # Código ainda não definido (caso KwKwK): prefixo + seu primeiro byte.
+                entry = prefixo + prefixo[:1]
+            else:
+                raise ValueError(f"Código LZW inválido: {codigo}")
+
+            write(entry)
+            if prefixo is not None and size < max_code:
+                add(prefixo + entry[:1])
+                size += 1
+            prefixo = entry
+
+        self.prefixo = prefixo
+        return b"".join(output)
+
+    def _decode_bounded(self, codes):
+        """decode() acima de DECODER_MEMORY, quando uma entrada pode ser uma ligação (ver _add)."""
+        phrases = self.phrases
+        add = phrases.append
+        size = len(phrases)
+        max_code = self.max_code
+        clear_code = self.clear_code
+        prefixo = self.prefixo
+        prefix_code = self.prefix_code
+
+        output = []
+        write = output.append
+        for codigo in codes:
+            if codigo < size:
+                entry = phrases[codigo]
+                if entry is None:
+                    entry = self._rebuild(codigo)
+            elif codigo == clear_code:
+                # O reinício volta às frases prontas: o resto do trecho segue no laço comum.
+                self.reset()
+                write(self._decode(codes))
+                return b"".join(output)
+            elif codigo == size and prefixo is not None:
+                entry = prefixo + prefixo[:1]
+            else:
+                raise ValueError(f"Código LZW inválido: {codigo}")
+
+            write(entry)
+            if prefixo is not None and size < max_code:
+                add(self._add(size, prefixo, prefix_code, entry[:1]))
+                size += 1
+            prefixo = entry
+            prefix_code = codigo
+
+        self.prefixo = prefixo
+        self.prefix_code = prefix_code
+        return b"".join(output)
+
+    def _start_eviction(self):
+        """Dicionário cheio: passa à política os prefixos e últimos bytes das entradas a partir de 256."""
+        phrases = self.phrases
+        links = self.links or {}
+        # Só as frases prontas entram no índice; as que têm ligação já sabem o prefixo.
+        index = {phrase: code for code, phrase in enumerate(phrases) if phrase is not None}
+        prefixes = []
+        lasts = bytearray()
+        for code in range(256, len(phrases)):
+            link = links.get(code)
+            if link is not None:
+                prefixes.append(link[0])
+                lasts.append(link[1])
+            else:
+                phrase = phrases[code]
+                prefixes.append(index[phrase[:-1]])
+                lasts.append(phrase[-1])
+        self.eviction.start(prefixes, bytes(lasts))
+
+    def _decode_evicting(self, codes):
+        """
+        decode() com política de descarte. A entrada que o compressor criou ao emitir um código
+        só é conhecida aqui no código seguinte; a vítima é escolhida antes de interpretá-lo, pois
+        ele pode ser justamente a entrada nova (o caso KwKwK, agora no código da vítima). As
+        vítimas são folhas, então nenhuma ligação (ver _add) aponta para elas.
+        """
+        policy = self.eviction
+        phrases = self.phrases
+        max_code = self.max_code
+        clear_code = self.clear_code
+        prefixo = self.prefixo
+        prefix_code = self.prefix_code
+
+        output = []
+        write = output.append
+        for codigo in codes:
+            if codigo == clear_code:
+                self.reset()
+                phrases = self.phrases
+                prefixo = prefix_code = None
+                continue
+
+            size = len(phrases)
+            if policy.active:
+                victim = policy.victim(prefix_code) if prefixo is not None else None
+                if codigo == victim:
+                    entry = prefixo + prefixo[:1]
+                elif codigo < size:
+                    entry = phrases[codigo]
+                    if entry is None:
+                        entry = self._rebuild(codigo)
+                else:
+                    raise ValueError(f"Código LZW inválido: {codigo}")
+                if victim is not None:
+                    phrases[victim] = (prefixo + entry[:1] if self.links is None
+                                       else self._add(victim, prefixo, prefix_code, entry[:1]))
+                    policy.replace(victim, prefix_code, entry[0])
+                policy.touch(codigo)
+            else:
+                if codigo < size:
+                    entry = phrases[codigo]
+                    if entry is None:
+                        entry = self._rebuild(codigo)
+                elif codigo == size and prefixo is not None:
+                    entry = prefixo + prefixo[:1]
+                else:
+                    raise ValueError(f"Código LZW inválido: {codigo}")
+                if prefixo is not None and size < max_code:
+                    phrases.append(prefixo + entry[:1] if self.links is None
+                                   else self._add(size, prefixo, prefix_code, entry[:1]))
+                    if size + 1 == max_code:
+                        self._start_eviction()
+                        policy.touch(codigo)
+
+            write(entry)
+            prefixo = entry
+            prefix_code = codigo
+
+        self.prefixo = prefixo
+        self.prefix_code = prefix_code
+        return b"".join(output)
@@ -0,0 +1,301 @@
+import heapq
+import struct
+from collections import Counter
+
+from packing import *
+
+# Codificação de entropia dos códigos LZW (segundo estágio, opcional por arquivo).
+# Os códigos são agrupados em blocos de ENTROPY_BLOCK_CODES; em cada bloco, os códigos mais
+# frequentes recebem um código de Huffman canônico e os demais são gravados como um símbolo de
+# escape seguido do código na largura que o empacotador simples usaria (crescente com o
+# WidthSchedule, ou max_bits). O tamanho da tabela é escolhido por bloco entre TABLE_SIZES pelo
+# menor resultado; quando nenhuma tabela compensa, o bloco vai sem Huffman, com os mesmos bits
+# do empacotador simples: a saída nunca passa deste mais os cabeçalhos dos blocos.
+
+ENTROPY_BLOCK_CODES = 1 << 16
+
+# Quantidades de códigos com entrada na tabela avaliadas em cada bloco (0: bloco sem Huffman).
+TABLE_SIZES = (0, 15, 63, 255, 1023, 4095)
+
+# Comprimento máximo dos códigos de Huffman (define o tamanho da tabela de decodificação).
+MAX_CODE_LENGTH = 15
+
+METHOD_RAW = 0
+METHOD_HUFFMAN = 1
+
+# método, largura dos códigos, entradas na tabela, códigos no bloco, bytes após o cabeçalho
+ENTROPY_BLOCK = struct.Struct("<BBHII")
+
+def huffman_lengths(freqs, limit=MAX_CODE_LENGTH):
+    """Comprimentos dos códigos de Huffman para as frequências (todas > 0), limitados a `limit` bits."""
+    n = len(freqs)
+    if n == 1:
+        return [1]
+    while True:
+        heap = [(f, i) for i, f in enumerate(freqs)]
+        heapq.heapify(heap)
+        parent = [0] * (2 * n - 1)
+        node = n
+        while len(heap) > 1:
+            f1, a = heapq.heappop(heap)
+            f2, b = heapq.heappop(heap)
+            parent[a] = parent[b] = node
+            heapq.heappush(heap, (f1 + f2, node))
+            node += 1
+        # Cada nó interno tem número maior que os filhos: a profundidade sai da raiz para baixo.
+        depth = [0] * (2 * n - 1)
+        for i in range(2 * n - 3, -1, -1):
+            depth[i] = depth[parent[i]] + 1
+        lengths = depth[:n]
+        if max(lengths) <= limit:
+            return lengths
+        # Achata a distribuição até caber no limite.
+        freqs = [(f + 1) >> 1 for f in freqs]
+
+def canonical_codes(lengths):
+    """Códigos canônicos com os bits invertidos (o fluxo é lido do bit menos significativo)."""
+    codes = [0] * len(lengths)
+    code = 0
+    previous = 0
+    for i in sorted(range(len(lengths)), key=lambda i: (lengths[i], i)):
+        code <<= lengths[i] - previous
+        previous = lengths[i]
+        codes[i] = int(format(code, f"0{previous}b")[::-1], 2)
+        code += 1
+    return codes
+
+def _plan(codes, raw_bits, width):
+    """
+    Escolhe a tabela do bloco. Retorna (custo em bits, símbolos da tabela, comprimentos com o
+    escape por último); sem tabela, (custo, [], []).
+    """
+    ranked = Counter(codes).most_common()
+    average = raw_bits / len(codes)
+    best = (raw_bits, [], [])
+    for size in TABLE_SIZES[1:]:
+        size = min(size, len(ranked))
+        escaped = sum(count for _, count in ranked[size:])
+        freqs = [count for _, count in ranked[:size]] + [max(escaped, 1)]
+        lengths = huffman_lengths(freqs)
+        cost = (sum(f * l for f, l in zip(freqs, lengths)) + escaped * average +
+                size * width + (size + 1) * 4)
+        if cost < best[0]:
+            best = (cost, [symbol for symbol, _ in ranked[:size]], lengths)
+        if size == len(ranked):
+            break
+    return best
+
+def _bit_string(value, length):
+    """Os `length` bits do valor como texto, na ordem do fluxo (bit menos significativo primeiro)."""
+    return format(value, f"0{length}b")[::-1] if length else ""
+
+class EntropyPacker:
+    """
+    Substitui o empacotador de largura fixa ou variável: acumula os códigos e grava um bloco a
+    cada ENTROPY_BLOCK_CODES códigos (flush() grava o restante). writer.total_bits conta os bits
+    gravados, como nos outros empacotadores.
+    """
+    def __init__(self, max_bits, first_code=256, variable_width=True, block_codes=ENTROPY_BLOCK_CODES):
+        self.max_bits = max_bits
+        self.clear_code = (1 << max_bits) - 1
+        self.schedule = WidthSchedule(max_bits, first_code) if variable_width else None
+        self.block_codes = block_codes
+        self.pending = []
+        self.writer = BitWriter()
+
+    def _pieces(self, codes):
+        """Trechos (códigos, largura) do empacotador simples (avança o cronograma, como VariableCodePacker)."""
+        if self.schedule is None:
+            return [(codes, self.max_bits)]
+        return list(self.schedule.pieces(codes, self.clear_code))
+
+    def _encode_raw(self, pieces):
+        """Bloco sem tabela: os mesmos bits do empacotador simples, gravados em lote."""
+        stream = BitWriter()
+        output = []
+        for segment, code_width in pieces:
+            if segment[-1] == self.clear_code:
+                segment[-1] = (1 << code_width) - 1
+            output.append(stream.write(segment, code_width))
+        output.append(stream.flush())
+        return b"".join(output)
+
+    def _encode_huffman(self, pieces, symbols, lengths):
+        """
+        Fluxo de bits do bloco com tabela. Cada código vira o texto dos seus bits (consulta ao
+        dicionário da tabela, ou escape seguido do código); o texto do bloco inteiro é convertido
+        de uma vez com int(..., 2), sem laço Python por bit.
+        """
+        huffman = canonical_codes(lengths)
+        strings = {symbol: _bit_string(cw, length) for symbol, cw, length in zip(symbols, huffman, lengths)}
+        escape = _bit_string(huffman[-1], lengths[-1])
+        get = strings.get
+        clear_code = self.clear_code
+        bits = []
+        for segment, code_width in pieces:
+            cleared = segment[-1] == clear_code
+            if cleared:
+                segment = segment[:-1]
+            digits = f"0{code_width}b"
+            bits += [get(code) or escape + format(code, digits)[::-1] for code in segment]
+            if cleared:
+                # O código de limpeza fora da tabela é gravado com todos os bits em 1 na largura atual.
+                bits.append(get(clear_code) or escape + "1" * code_width)
+        stream = "".join(bits)
+        return int(stream[::-1], 2).to_bytes((len(stream) + 7) // 8, 'little')
+
+    def _encode_block(self, codes):
+        """Codifica um bloco de códigos (cabeçalho, tabela e fluxo de bits), alinhado em bytes."""
+        pieces = self._pieces(codes)
+        width = max(max(codes).bit_length(), 1)
+        raw_bits = sum(len(segment) * code_width for segment, code_width in pieces)
+        _, symbols, lengths = _plan(codes, raw_bits, width)
+
+        if symbols:
+            writer = BitWriter()
+            table = writer.write(lengths, 4) + writer.write(symbols, width) + writer.flush()
+            payload = table + self._encode_huffman(pieces, symbols, lengths)
+        else:
+            payload = self._encode_raw(pieces)
+
+        method = METHOD_HUFFMAN if symbols else METHOD_RAW
+        block = ENTROPY_BLOCK.pack(method, width, len(symbols), len(codes), len(payload)) + payload
+        self.writer.total_bits += 8 * len(block)
+        return block
+
+    def pack(self, codes):
+        self.pending.extend(codes)
+        if len(self.pending) < self.block_codes:
+            return b""
+        blocks = []
+        while len(self.pending) >= self.block_codes:
+            blocks.append(self._encode_block(self.pending[:self.block_codes]))
+            del self.pending[:self.block_codes]
+        return b"".join(blocks)
+
+    def flush(self):
+        if not self.pending:
+            return b""
+        block = self._encode_block(self.pending)
+        self.pending = []
+        return block
+
+# Marcas na tabela de decodificação (valores negativos, fora do caminho rápido do laço).
+_ESCAPE = -1
+_CLEAR = -2
+
+class EntropyUnpacker:
+    """Operação inversa de EntropyPacker, sobre um fluxo de blocos entregue em partes."""
+    def __init__(self, max_bits, first_code=256, variable_width=True):
+        self.max_bits = max_bits
+        self.clear_code = (1 << max_bits) - 1
+        self.schedule = WidthSchedule(max_bits, first_code) if variable_width else None
+        self.buffer = bytearray()
+
+    def unpack(self, data):
+        self.buffer += data
+        codes = []
+        pos = 0
+        while len(self.buffer) - pos >= ENTROPY_BLOCK.size:
+            method, width, size, count, length = ENTROPY_BLOCK.unpack_from(self.buffer, pos)
+            end = pos + ENTROPY_BLOCK.size + length
+            if end > len(self.buffer):
+                break
+            if method not in (METHOD_RAW, METHOD_HUFFMAN):
+                raise ValueError(f"Método de entropia desconhecido: {method}")
+            codes.extend(self._decode_block(width, size, count, bytes(self.buffer[pos + ENTROPY_BLOCK.size:end])))
+            pos = end
+        del self.buffer[:pos]
+        return codes
+
+    def _decode_raw(self, count, payload):
+        """Bloco sem tabela: códigos na largura do empacotador simples, lidos em lote."""
+        schedule = self.schedule
+        reader = BitReader()
+        reader.feed(payload)
+        if schedule is None:
+            return reader.read(self.max_bits, count)
+        output = []
+        while len(output) < count:
+            code_width = schedule.width
+            run = min(schedule.remaining() or count, count - len(output))
+            segment = reader.read(code_width, run)
+            all_ones = (1 << code_width) - 1
+            if all_ones in segment:
+                # Código de limpeza: o que vem depois dele usa o cronograma reiniciado.
+                n = segment.index(all_ones)
+                reader.unread(segment[n + 1:], code_width)
+                del segment[n + 1:]
+                segment[n] = self.clear_code
+                schedule.reset()
+            elif len(segment) < run:
+                raise ValueError("Bloco de entropia truncado")
+            else:
+                schedule.advance(run)
+            output += segment
+        return output
+
+    def _decode_block(self, width, size, count, payload):
+        if not size:
+            return self._decode_raw(count, payload)
+        table_bytes = ((size + 1) * 4 + size * width + 7) // 8
+        reader = BitReader()
+        reader.feed(payload[:table_bytes])
+        lengths = reader.read(4, size + 1)
+        symbols = reader.read(width, size)
+        # O escape e o código de limpeza vão para o caminho lento do laço.
+        symbols = [_CLEAR if symbol == self.clear_code else symbol for symbol in symbols] + [_ESCAPE]
+
+        # Tabela de decodificação: os próximos `bits` bits dão (código << 4) | comprimento.
+        bits = max(lengths)
+        mask = (1 << bits) - 1
+        table = [0] * (1 << bits)
+        for symbol, code, length in zip(symbols, canonical_codes(lengths), lengths):
+            table[code::1 << length] = [(symbol << 4) | length] * (1 << (bits - length))
+
+        schedule = self.schedule
+        clear_code = self.clear_code
+        # O fluxo lido em palavras de 64 bits (completado com zeros), sem fatiar bytes a cada leitura.
+        data = payload[table_bytes:]
+        words = array_from_bytes('Q', data + bytes(-len(data) % 8 + 8))
+        output = [0] * count
+        acc = 0
+        n = 0
+        pos = 0
+        j = 0
+        # Cada passo decodifica os códigos até a largura mudar (ou um código de limpeza).
+        while j < count:
+            if schedule is None:
+                code_width, run = self.max_bits, count - j
+            else:
+                code_width = schedule.width
+                run = min(schedule.remaining() or count, count - j)
+            all_ones = (1 << code_width) - 1
+            cleared = False
+            for j in range(j, j + run):
+                if n < 48:
+                    acc |= words[pos] << n
+                    pos += 1
+                    n += 64
+                entry = table[acc & mask]
+                length = entry & 15
+                acc >>= length
+                n -= length
+                code = entry >> 4
+                if code < 0:
+                    if code == _ESCAPE:
+                        code = acc & all_ones
+                        acc >>= code_width
+                        n -= code_width
+                    if code == all_ones or code == _CLEAR:
+                        output[j] = clear_code
+                        cleared = True
+                        break
+                output[j] = code
+            j += 1
+            if schedule is not None:
+                if cleared:
+                    schedule.reset()
+                else:
+                    schedule.advance(run)
+        return output
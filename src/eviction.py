@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+# Políticas de descarte: com o dicionário cheio, em vez de congelá-lo, cada código emitido
+# continua gerando uma entrada nova, que ocupa o código de uma entrada descartada. Só folhas
+# (entradas que não são prefixo de nenhuma outra) podem ser descartadas, e nunca os códigos
+# iniciais (bytes e dicionário treinado). Compressor e decodificador fazem as mesmas chamadas na
+# mesma ordem: start() quando o dicionário enche, touch() para cada código emitido e, a cada
+# entrada nova, victim() seguido de replace(); assim escolhem sempre o mesmo código.
+
+class LRUEviction:
+    """Descarta a folha usada (emitida ou criada) há mais tempo."""
+    def __init__(self, first_code, max_code):
+        self.first_code = first_code
+        self.max_code = max_code
+        self.evictions = 0      # entradas descartadas desde a criação (estatística)
+        self.reset()
+
+    def reset(self):
+        """Volta ao dicionário em crescimento (sem acompanhamento até o próximo start())."""
+        self.active = False
+        self.leaves = None
+        self.prefix = None
+        self.suffix = None
+        self.children = None
+
+    def start(self, prefixes, suffixes):
+        """
+        Passa a acompanhar o dicionário cheio. prefixes e suffixes descrevem as entradas
+        256 .. max_code - 1, na ordem dos códigos (como entries() dos dicionários); a recência
+        inicial das folhas é a ordem dos códigos.
+        """
+        self.prefix = [0] * 256 + list(prefixes)
+        self.suffix = bytearray(256) + suffixes
+        children = [0] * self.max_code
+        for prefix in prefixes:
+            children[prefix] += 1
+        self.children = children
+        self.leaves = OrderedDict.fromkeys(code for code in range(self.first_code, self.max_code) if not children[code])
+        self.active = True
+
+    def touch(self, code):
+        try:
+            self.leaves.move_to_end(code)
+        except KeyError:
+            pass
+
+    def victim(self, keep):
+        """Código a descartar para a entrada nova, cujo prefixo é `keep` (que não pode sair); None se não houver."""
+        for code in self.leaves:
+            if code != keep:
+                return code
+        return None
+
+    def replace(self, victim, prefix, byte):
+        """Registra que o código `victim` passou a ser a entrada (prefix, byte)."""
+        leaves = self.leaves
+        children = self.children
+        del leaves[victim]
+        old = self.prefix[victim]
+        children[old] -= 1
+        if not children[old] and old >= self.first_code:
+            leaves[old] = None
+        if not children[prefix]:
+            leaves.pop(prefix, None)
+        children[prefix] += 1
+        self.prefix[victim] = prefix
+        self.suffix[victim] = byte
+        leaves[victim] = None
+        self.evictions += 1
+
+    def phrase(self, code):
+        """Sequência de bytes de um código, pela cadeia de prefixos."""
+        output = bytearray()
+        while code >= 256:
+            output.append(self.suffix[code])
+            code = self.prefix[code]
+        output.append(code)
+        output.reverse()
+        return bytes(output)
+
+EVICTION_POLICIES = {
+    "lru": LRUEviction,
+}
@@ -0,0 +1,209 @@
+import struct
+from array import array
+
+from packing import *
+
+FLAT_STATE = struct.Struct("<I")    # next_code, antes dos arrays da tabela
+
+class FlatDictionary:
+    """
+    Dicionário LZW em tabela plana: mapeia (código do prefixo, byte) -> código
+    usando endereçamento aberto sobre arrays, sem um objeto por entrada.
+    Os 256 códigos de um byte são implícitos (código == byte).
+    Expõe a mesma API de cursor da CompactTrie.
+    """
+    EMPTY = -1
+
+    def __init__(self, max_code):
+        self.max_code = max_code
+        # Tabela com pelo menos o dobro de posições do número de códigos (fator de carga <= 0.5).
+        self.bits = max(9, max_code.bit_length() + 1)
+        self.mask = (1 << self.bits) - 1
+        self.keys = array('q', [self.EMPTY]) * (1 << self.bits)
+        self.values = array('i', [0]) * (1 << self.bits)
+        self.next_code = 256
+        self.cursor = self.EMPTY
+        self.last_key = self.EMPTY
+        self.last_slot = 0
+
+    def copy(self):
+        """Cópia independente da tabela (cópia direta dos arrays), com o cursor vazio."""
+        clone = FlatDictionary.__new__(FlatDictionary)
+        clone.__dict__.update(self.__dict__)
+        clone.keys = self.keys[:]
+        clone.values = self.values[:]
+        clone.cursor = self.EMPTY
+        clone.last_key = self.EMPTY
+        return clone
+
+    def dump(self):
+        """Estado completo da tabela em bytes (next_code e os dois arrays), para snapshots."""
+        return FLAT_STATE.pack(self.next_code) + array_bytes(self.keys) + array_bytes(self.values)
+
+    @classmethod
+    def load(cls, max_code, data, cursor=None):
+        """Restaura uma tabela gravada por dump() com leituras em bloco dos arrays."""
+        table = cls.__new__(cls)
+        table.max_code = max_code
+        table.bits = max(9, max_code.bit_length() + 1)
+        table.mask = (1 << table.bits) - 1
+        size = 1 << table.bits
+        (table.next_code,) = FLAT_STATE.unpack_from(data)
+        start = FLAT_STATE.size
+        table.keys = array_from_bytes('q', data[start:start + 8 * size])
+        table.values = array_from_bytes('i', data[start + 8 * size:start + 12 * size])
+        if len(table.keys) != size or len(table.values) != size:
+            raise ValueError("Estado da tabela corrompido")
+        table.cursor = cls.EMPTY if cursor is None else cursor
+        table.last_key = cls.EMPTY
+        table.last_slot = 0
+        return table
+
+    @classmethod
+    def from_entries(cls, max_code, prefixes, suffixes, cursor=None):
+        """Tabela com as entradas 256, 257, ... dadas por (código do prefixo, último byte), inseridas pela chave."""
+        table = cls(max_code)
+        keys = table.keys
+        values = table.values
+        slot = table._slot
+        for code, (prefix, byte) in enumerate(zip(prefixes, suffixes), 256):
+            key = (prefix << 8) | byte
+            h = slot(key)
+            keys[h] = key
+            values[h] = code
+        table.next_code = 256 + len(suffixes)
+        if cursor is not None:
+            table.cursor = cursor
+        return table
+
+    def entries(self, first_code=256):
+        """(códigos dos prefixos, últimos bytes) das entradas a partir de first_code, na ordem dos códigos."""
+        count = max(self.next_code - first_code, 0)
+        prefixes = array(SLOT_TYPECODE, [0]) * count
+        suffixes = bytearray(count)
+        for key, code in zip(self.keys, self.values):
+            if key != self.EMPTY and code >= first_code:
+                prefixes[code - first_code] = key >> 8
+                suffixes[code - first_code] = key & 0xFF
+        return prefixes, bytes(suffixes)
+
+    def _slot(self, key):
+        """Retorna a posição da chave na tabela, ou a posição vazia onde ela seria inserida."""
+        keys = self.keys
+        mask = self.mask
+        h = ((key * 0x9E3779B1) >> 16) & mask
+        k = keys[h]
+        while k != key and k != self.EMPTY:
+            h = (h + 1) & mask
+            k = keys[h]
+        return h
+
+    def reset_cursor(self):
+        """Posiciona o cursor na sequência vazia."""
+        self.cursor = self.EMPTY
+
+    def step(self, byte: int):
+        """
+        Avança o cursor por um byte.
+        Retorna True se a sequência resultante existe; caso contrário o cursor não se move.
+        """
+        if self.cursor < 0:
+            self.cursor = byte
+            return True
+
+        key = (self.cursor << 8) | byte
+        keys = self.keys
+        mask = self.mask
+        h = ((key * 0x9E3779B1) >> 16) & mask
+        k = keys[h]
+        while k != key:
+            if k == -1:
+                # Guarda a posição livre para o insert_at_cursor seguinte não repetir a sondagem.
+                self.last_key = key
+                self.last_slot = h
+                return False
+            h = (h + 1) & mask
+            k = keys[h]
+
+        self.cursor = self.values[h]
+        return True
+
+    def cursor_code(self):
+        """Retorna o código da sequência apontada pelo cursor."""
+        return self.cursor if self.cursor >= 0 else None
+
+    def insert_at_cursor(self, byte: int, code: int):
+        """Insere a sequência (cursor + byte) com o código informado, se houver espaço."""
+        if code >= self.max_code or self.cursor < 0:
+            return None
+
+        key = (self.cursor << 8) | byte
+        h = self.last_slot if key == self.last_key else self._slot(key)
+        self.keys[h] = key
+        self.values[h] = code
+        self.last_key = self.EMPTY
+        if code >= self.next_code:
+            self.next_code = code + 1
+        return code
+
+    def search(self, word: bytes):
+        """Retorna o código da sequência de bytes, ou None se ela não estiver no dicionário."""
+        if not word:
+            return None
+        code = word[0]
+        for byte in word[1:]:
+            h = self._slot((code << 8) | byte)
+            if self.keys[h] == self.EMPTY:
+                return None
+            code = self.values[h]
+        return code
+
+    def remove(self, word: bytes):
+        """Remove a sequência de bytes (as de um byte são implícitas e não são removidas)."""
+        if len(word) < 2:
+            return
+        prefix_code = self.search(word[:-1])
+        if prefix_code is not None:
+            self.remove_key((prefix_code << 8) | word[-1])
+
+    def remove_key(self, key):
+        """
+        Remove a chave (código do prefixo << 8) | byte sem deixar marcadores: as chaves seguintes
+        da mesma sequência de sondagem que não poderiam ficar depois da posição liberada voltam
+        para ela, e a sondagem continua terminando na primeira posição vazia.
+        """
+        keys = self.keys
+        values = self.values
+        mask = self.mask
+        h = self._slot(key)
+        if keys[h] == self.EMPTY:
+            return
+        j = h
+        while True:
+            j = (j + 1) & mask
+            k = keys[j]
+            if k == self.EMPTY:
+                break
+            home = ((k * 0x9E3779B1) >> 16) & mask
+            # A chave em j pode ir para h se a posição de origem dela não está em (h, j] (circular).
+            if (home <= h or home > j) if h < j else (home <= h and home > j):
+                keys[h] = k
+                values[h] = values[j]
+                h = j
+        keys[h] = self.EMPTY
+        self.last_key = self.EMPTY
+
+    def insert(self, word: bytes, code: int = None):
+        """Insere a sequência de bytes, cujo prefixo (word[:-1]) já deve estar no dicionário."""
+        if len(word) == 1:
+            return word[0]
+
+        prefix_code = self.search(word[:-1])
+        if prefix_code is None:
+            return None
+
+        self.cursor = prefix_code
+        code = self.next_code if code is None else code
+        result = self.insert_at_cursor(word[-1], code)
+        self.reset_cursor()
+        return result
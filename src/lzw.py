@@ -2,23 +2,125 @@ import os
 import io
 import time
 import sys
+import zlib
 
 from compact_trie import *
+from flat_dictionary import *
+from decoder import *
+from eviction import *
+from cache import *
 from compress_and_decompress import *
 
+# Implementações de dicionário disponíveis para a classe LZW (todas com a API de cursor).
+DICT_ENGINES = {
+    "trie": CompactTrie,
+    "flat": FlatDictionary,
+}
+
+# Dicionários iniciais (256 entradas de um byte e, se houver, as do dicionário treinado), um por
+# (engine, max_code, dicionário). O modelo é montado uma vez direto dos arrays de prefixos e
+# últimos bytes (from_entries de cada engine); cada reinício parte de uma cópia dele.
+_templates = {}
+
+def seeded_dictionary(dict_engine, max_code, trained=None):
+    """Retorna um dicionário novo com as entradas iniciais."""
+    key = (dict_engine, max_code, trained.id if trained else None)
+    template = _templates.get(key)
+    if template is None:
+        prefixes, suffixes = (trained.prefixes, trained.suffixes) if trained else ((), b"")
+        template = DICT_ENGINES[dict_engine].from_entries(max_code, prefixes, suffixes)
+        _templates[key] = template
+    return template.copy()
+
+def first_code_for(trained):
+    """Primeiro código livre: 256, ou depois das entradas do dicionário treinado."""
+    return trained.first_code if trained else 256
+
+# Tamanho da janela (bytes de entrada) usada para medir a taxa depois que o dicionário enche.
+CLEAR_WINDOW = 1 << 14
+
+class ClearPolicy:
+    """
+    Decide quando emitir o código de limpeza: depois que o dicionário enche, mede a taxa de
+    compressão em janelas de CLEAR_WINDOW bytes e pede a limpeza quando ela cai abaixo de
+    `threshold` vezes a melhor taxa observada desde então, ou quando a janela expande os dados
+    (dicionário formado por dados incompressíveis).
+    """
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.best = 0.0
+
+    def check(self, window_bytes, window_codes, bits):
+        if window_codes == 0:
+            return False
+        ratio = window_bytes * 8 / (window_codes * bits)
+        if ratio > self.best:
+            self.best = ratio
+            return ratio < 1
+        return ratio < 1 or ratio < self.best * self.threshold
+
 class LZW:
-    def __init__(self, max_bits=16):
+    def __init__(self, max_bits=16, dict_engine="trie", clear_ratio=None, variable_width=False, dictionary=None,
+                 entropy=False, eviction=None):
+        if dict_engine not in DICT_ENGINES:
+            raise ValueError(f"Dicionário desconhecido: {dict_engine}")
+        if eviction is not None and eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Política de descarte desconhecida: {eviction}")
+        if eviction and clear_ratio:
+            raise ValueError("A política de descarte e a limpeza por taxa (clear_ratio) não podem ser combinadas")
+
+        self.dict_engine = dict_engine
+        # Com clear_ratio, o dicionário cheio é reiniciado quando a taxa cai (ver ClearPolicy).
+        self.clear_policy = ClearPolicy(clear_ratio) if clear_ratio else None
+        # Com variable_width, os códigos crescem de 9 bits até max_bits (mesmo formato do modo dinâmico).
+        self.variable_width = variable_width
+        # Com entropy, os códigos passam pela codificação de entropia por blocos (ver entropy.py).
+        self.entropy = entropy
+        # Com eviction, o dicionário cheio continua aprendendo no lugar das entradas descartadas (ver eviction.py).
+        self.eviction = eviction
+        self.eviction_policy = None
+        # Dicionário treinado (ver trained_dictionary.py): entradas com que o dicionário começa.
+        self.dictionary = dictionary
+        self.first_code = first_code_for(dictionary)
+        self.set_max_bits(max_bits)
+
+    def set_max_bits(self, max_bits):
+        """Ajusta o tamanho máximo dos códigos e reinicia o dicionário."""
+        if self.first_code >= (1 << max_bits) - 1:
+            raise ValueError(f"O dicionário treinado não cabe em códigos de {max_bits} bits")
         self.max_bits = max_bits
         self.max_code = (1 << max_bits) - 1
+        # O último código nunca entra no dicionário: fica reservado para a limpeza.
+        self.clear_code = self.max_code
+        self.eviction_policy = EVICTION_POLICIES[self.eviction](self.first_code, self.max_code) if self.eviction else None
         self.reset()
 
+    def reset_dictionary(self):
+        """Volta o dicionário às entradas iniciais (também usado ao emitir o código de limpeza)."""
+        prof = get_profiler()
+        if prof:
+            previous = prof.switch("inicializacao_dicionario")
+            if hasattr(self, "trie"):
+                prof.count("divisoes_de_no", getattr(self.trie, "splits", 0))
+
+        self.dicionario_size = self.first_code
+        self.trie = seeded_dictionary(self.dict_engine, self.max_code, self.dictionary)
+
+        if self.clear_policy:
+            self.clear_policy.reset()
+        if self.eviction_policy:
+            self.eviction_policy.reset()
+        if prof:
+            prof.switch(previous)
+
     def reset(self):
-        self.dicionario_size = 256
-        self.trie = CompactTrie(self.max_code)
         self.start = time.time()
+        self.reset_dictionary()
 
-        for i in range(256):
-            self.trie.insert(bytes([i]), i)
+        self.decoder = None
 
         self.stats = {
             "start": self.start,
@@ -27,198 +129,368 @@ class LZW:
             "dictionary_memory": sys.getsizeof(self.trie),
             "total_time": 0,
             "compression_ratio": 0,
+            "dictionary_full_at": None,
+            "clears": 0,
+            "entradas_criadas": 0,
+            "descartes": 0,
+            "blocos_guardados": 0,
         }
 
-    def compress(self, input_bytes):
-        prefixo = bytes()
-        self.codes = []
-        self.stats["tamanho_original"] = len(input_bytes)
-
-        for byte in input_bytes:
-            current_word = prefixo + bytes([byte])
-            found_code = self.trie.search(current_word)
-
-            if found_code is not None:
-                prefixo = current_word
+    def begin_compress(self):
+        """Inicia uma nova sequência de entrada (o dicionário é mantido)."""
+        self.trie.reset_cursor()
+        self.pending = False
+        # O tempo medido não inclui a inicialização do dicionário feita em reset().
+        self.stats["start"] = time.time()
+
+    def compress_chunk(self, input_bytes):
+        """Comprime um trecho da entrada, mantendo o estado entre chamadas. Retorna os códigos completos."""
+        codes = []
+        offset = self.stats["tamanho_original"]
+        self.stats["tamanho_original"] += len(input_bytes)
+
+        view = memoryview(input_bytes)
+        pos = 0
+        while pos < len(view):
+            self.pending = True
+            if self.dicionario_size < self.max_code:
+                size = self.dicionario_size
+                pos = self._compress_growing(view, pos, offset, codes)
+                self.stats["entradas_criadas"] += self.dicionario_size - size
+            elif self.eviction_policy:
+                pos = self._compress_evicting(view, pos, codes)
             else:
-                prefix_code = self.trie.search(prefixo)
-                if prefix_code is not None:
-                    self.codes.append(prefix_code)
-
-                self.trie.insert(current_word, self.dicionario_size)
-                self.dicionario_size += 1
-
-                prefixo = bytes([byte])
-
-        if prefixo:
-            prefix_code = self.trie.search(prefixo)
-            if prefix_code is not None:
-                self.codes.append(prefix_code)
-
-        self.stats["tamanho_comprimido"] = len(self.codes) * (self.max_bits // 8)
-        self.stats["compression_ratio"] = self.stats["tamanho_original"] / self.stats["tamanho_comprimido"] if self.stats["tamanho_comprimido"] > 0 else 0
+                pos = self._compress_full(view, pos, codes)
+
+        return codes
+
+    def _compress_growing(self, view, pos, offset, codes):
+        """Enquanto o dicionário cresce, cada código emitido gera uma nova entrada. Retorna onde parou."""
+        trie = self.trie
+        step = trie.step
+
+        for i, byte in enumerate(view[pos:], pos):
+            if step(byte):
+                continue
+
+            # Fim da maior sequência conhecida: emite o código e insere o novo filho no cursor.
+            codes.append(trie.cursor_code())
+            trie.insert_at_cursor(byte, self.dicionario_size)
+            self.dicionario_size += 1
+
+            trie.reset_cursor()
+            step(byte)
+
+            if self.dicionario_size >= self.max_code:
+                if self.stats["dictionary_full_at"] is None:
+                    self.stats["dictionary_full_at"] = offset + i
+                return i + 1
+        return len(view)
+
+    def _compress_full(self, view, pos, codes):
+        """Dicionário cheio: apenas busca. Com a política de limpeza, avança uma janela por vez."""
+        trie = self.trie
+        step = trie.step
+        end = len(view) if self.clear_policy is None else min(pos + CLEAR_WINDOW, len(view))
+        first = len(codes)
+
+        for byte in view[pos:end]:
+            if step(byte):
+                continue
+
+            codes.append(trie.cursor_code())
+            trie.reset_cursor()
+            step(byte)
+
+        if self.clear_policy and self.clear_policy.check(end - pos, len(codes) - first, self.max_bits):
+            # Encerra a sequência atual e avisa o decodificador para reiniciar o dicionário.
+            codes.append(trie.cursor_code())
+            codes.append(self.clear_code)
+            self.stats["clears"] += 1
+            self.reset_dictionary()
+            self.pending = False
+        return end
+
+    def _compress_evicting(self, view, pos, codes):
+        """Dicionário cheio com política de descarte: cada código emitido ainda gera uma entrada."""
+        policy = self.eviction_policy
+        if not policy.active:
+            policy.start(*self.trie.entries())
+        evictions = policy.evictions
+        _evicting_piece(self.trie, view[pos:], codes, policy)
+        self.stats["descartes"] += policy.evictions - evictions
+        self.stats["entradas_criadas"] += policy.evictions - evictions
+        return len(view)
+
+    def finish_compress(self):
+        """Encerra a sequência de entrada, retornando o código do prefixo pendente."""
+        codes = [self.trie.cursor_code()] if self.pending else []
+        if codes and self.eviction_policy and self.eviction_policy.active:
+            # O decodificador conta todo código recebido como uso, inclusive este.
+            self.eviction_policy.touch(codes[0])
+        self.pending = False
+        self.trie.reset_cursor()
+        return codes
+
+    def restart(self):
+        """
+        Ponto de reinício do índice de acesso aleatório: encerra a sequência atual, emite o
+        código de limpeza e volta ao dicionário inicial. Retorna os códigos emitidos.
+        """
+        codes = self.finish_compress()
+        codes.append(self.clear_code)
+        self.reset_dictionary()
+        return codes
+
+    def update_compress_stats(self, total_bits):
+        self.stats["tamanho_comprimido"] = (total_bits + 7) // 8
         self.stats["compression_ratio"] = self.stats["tamanho_original"] / self.stats["tamanho_comprimido"] if self.stats["tamanho_comprimido"] > 0 else 0
 
         self.stats["total_time"] = time.time() - self.stats["start"]
 
-        return self.codes
-
-    def decompress(self, compressed_codes):
-        reverse_dicionario = {(i & ((1 << self.get_bits_for_code()) - 1)): bytes([i]) for i in range(256)}
-        prefixo = reverse_dicionario[compressed_codes[0]]
-        result = bytearray(prefixo)
+    def compress(self, input_bytes):
+        self.begin_compress()
+        self.codes = self.compress_chunk(input_bytes)
+        self.codes.extend(self.finish_compress())
+        self.update_compress_stats(self.code_bits(self.codes))
 
-        for codigo in compressed_codes[1:]:
-            if codigo in reverse_dicionario:
-                entry = reverse_dicionario[codigo]
-            else:
-                entry = prefixo + prefixo[:1]
+        return self.codes
 
-            result.extend(entry)
-            reverse_dicionario[len(reverse_dicionario)] = prefixo + entry[:1]
-            prefixo = entry
+    def begin_decompress(self):
+        """Inicia a decodificação de uma nova sequência de códigos."""
+        eviction = EVICTION_POLICIES[self.eviction](self.first_code, self.max_code) if self.eviction else None
+        self.decoder = LZWDecoder(self.max_code, self.clear_code, self.dictionary.phrases() if self.dictionary else None,
+                                  eviction)
+        self.stats["detamanho_comprimido"] = 0
+        self.stats["start"] = time.time()
 
-        self.stats["detamanho_comprimido"] = len(result)
+    def decompress_chunk(self, compressed_codes):
+        """Decodifica um trecho da sequência de códigos, mantendo o dicionário entre chamadas."""
+        result = self.decoder.decode(compressed_codes)
+        self.stats["detamanho_comprimido"] += len(result)
 
         self.stats["total_time"] = time.time() - self.stats["start"]
 
-        return bytes(result)
+        return result
+
+    def decompress(self, compressed_codes):
+        self.begin_decompress()
+        return self.decompress_chunk(compressed_codes)
 
     def get_bits_for_code(self):
         return self.max_bits
 
+    def code_bits(self, codes):
+        """Total de bits ocupados pelos códigos no fluxo de saída."""
+        if self.variable_width:
+            return variable_bits(codes, self.max_bits, self.first_code)
+        return len(codes) * self.max_bits
+
+    def make_packer(self):
+        """Empacotador correspondente à largura dos códigos (fixa ou crescente) e à codificação de entropia."""
+        if self.entropy:
+            return EntropyPacker(self.max_bits, self.first_code, self.variable_width)
+        if self.variable_width:
+            return VariableCodePacker(self.max_bits, self.first_code)
+        return CodePacker(self.max_bits)
+
+    def make_unpacker(self):
+        if self.entropy:
+            return EntropyUnpacker(self.max_bits, self.first_code, self.variable_width)
+        if self.variable_width:
+            return VariableCodeUnpacker(self.max_bits, self.first_code)
+        return CodeUnpacker(self.max_bits)
+
+    def cached_stats(self, compressed_file_path, seconds):
+        """Estatísticas de um resultado obtido do cache: os tamanhos vêm do cabeçalho do arquivo."""
+        info = read_info(compressed_file_path)
+        self.stats["tamanho_original"] = info.get("tamanho_original") or 0
+        self.stats["tamanho_comprimido"] = info["tamanho_comprimido"]
+        self.stats["compression_ratio"] = self.stats["tamanho_original"] / self.stats["tamanho_comprimido"] if self.stats["tamanho_comprimido"] > 0 else 0
+        self.stats["total_time"] = seconds
+        self.stats["cache"] = True
+
     def print_stats(self):
         print("Estatísticas de Compressão:")
         print(f" - Tamanho do arquivo original: {self.stats['tamanho_original']} bytes")
         print(f" - Tamanho do arquivo comprimido: {self.stats['tamanho_comprimido']} bytes")
         print(f" - Taxa de Compressão: {self.stats['compression_ratio']:.2f}")
         print(f" - Tempo total de execução: {self.stats['total_time']:.4f} segundos")
-
-def LZW_not_fixed_compress(input_file_path, max_bits=12):
-    base_name = os.path.basename(input_file_path)
-    compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
-
-    with open(input_file_path, 'rb') as input_file, open(compressed_file_path, 'wb') as output_file:
-        dicionario = CompactTrie2()
-        for i in range(256):
-            dicionario[str(bytes([i]))] = i
-        prefixo = bytes()
-        current_bits = 9
-        dicionario_limited = False
-        dic_size = 256
-        
-        buffer = 0
-        bits_in_buffer = 0
-
-        while True:
-            byte = input_file.read(1)
-            if not byte:
-                break
-
-            byte = byte[0]
-            if dicionario[str(prefixo + bytes([byte]))] != None:
-                prefixo += bytes([byte])
-            else:
-                code = dicionario[str(prefixo)]
-                buffer |= (code << bits_in_buffer)
-                bits_in_buffer += current_bits
-
-                while bits_in_buffer >= 8:
-                    output_file.write(bytes([buffer & 0xFF]))
-                    buffer >>= 8
-                    bits_in_buffer -= 8
-
-                if not dicionario_limited:
-                    dicionario[str(prefixo + bytes([byte]))] = dic_size
-                    dic_size += 1
-
-                if dic_size >= ((1 << current_bits) - 1):
-                    if current_bits < max_bits:
-                        current_bits += 1
-                    else:
-                        dicionario_limited = True
-            
-                prefixo = bytes([byte])
-
-        if prefixo:
-            code = dicionario[str(prefixo)]
-            buffer |= (code << bits_in_buffer)
-            bits_in_buffer += current_bits
-
-            while bits_in_buffer >= 8:
-                output_file.write(bytes([buffer & 0xFF]))
-                buffer >>= 8
-                bits_in_buffer -= 8
-
-        output_file.write(bytes([max_bits]))
+        if self.stats.get("cache"):
+            print(" - Resultado obtido do cache (sem compressão)")
+        if "auto" in self.stats:
+            print(f" - Parâmetros automáticos: {self.stats['auto']['motivo']} (testes: {self.stats['auto']['tempo_testes']:.4f} segundos)")
+
+def _evicting_piece(trie, piece, codes, policy):
+    """
+    Codifica um trecho com o dicionário cheio e a política de descarte: a cada código emitido,
+    a entrada escolhida pela política sai do dicionário e a sequência nova ocupa o código dela.
+    """
+    step = trie.step
+    touch = policy.touch
+    victim_for = policy.victim
+    for byte in piece:
+        if step(byte):
+            continue
+        code = trie.cursor_code()
+        codes.append(code)
+        touch(code)
+        victim = victim_for(code)
+        if victim is not None:
+            # A vítima é uma folha diferente do cursor: removê-la não altera o caminho até ele.
+            trie.remove(policy.phrase(victim))
+            policy.replace(victim, code, byte)
+            trie.insert_at_cursor(byte, victim)
+        trie.reset_cursor()
+        step(byte)
+
+def LZW_not_fixed_compress(input_file_path, max_bits=12, clear_ratio=None, compressed_file_path=None, dictionary=None,
+                           entropy=False, eviction=None):
+    # O modo dinâmico é o LZW de largura variável com o dicionário "flat"; só o cabeçalho muda.
+    lzw_compressor = LZW(max_bits, "flat", clear_ratio, True, dictionary, entropy, eviction)
+    if compressed_file_path is None:
+        base_name = os.path.basename(input_file_path)
+        compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
+
+    prof = get_profiler()
+    if prof:
+        prof.switch("leitura")
+    with open(input_file_path, 'rb') as input_file:
+        input_data = map_file(input_file)
+
+    with open(compressed_file_path, 'wb') as output_file:
+        # A entrada inteira está mapeada: tamanho e CRC32 já vão no cabeçalho.
+        header = FileHeader(MODE_DYNAMIC, max_bits, dictionary.id if dictionary else None,
+                            len(input_data), zlib.crc32(input_data), entropy=entropy,
+                            eviction=bool(eviction))
+        output_file.write(header.pack())
+
+        # Os códigos são empacotados a cada trecho (a largura segue o mesmo cronograma).
+        packer = lzw_compressor.make_packer()
+        lzw_compressor.begin_compress()
+        total_codes = 0
+        for offset in range(0, len(input_data), CHUNK_SIZE):
+            if prof:
+                prof.switch("busca_insercao")
+            codes = lzw_compressor.compress_chunk(input_data[offset:offset + CHUNK_SIZE])
+            if prof:
+                prof.switch("empacotamento")
+            packed = packer.pack(codes)
+            if prof:
+                prof.switch("escrita")
+            output_file.write(packed)
+            total_codes += len(codes)
+
+        codes = lzw_compressor.finish_compress()
+        if prof:
+            prof.switch("empacotamento")
+        packed = packer.pack(codes) + packer.flush()
+        if prof:
+            prof.switch("escrita")
+        output_file.write(packed)
+        if prof:
+            stats = lzw_compressor.stats
+            prof.switch(None)
+            prof.count("bytes_entrada", len(input_data))
+            prof.count("codigos", total_codes + len(codes))
+            prof.count("limpezas", stats["clears"])
+            prof.count("transicoes_de_largura", packer.schedule.transitions)
+            prof.mark("dicionario_cheio_em", stats["dictionary_full_at"])
+            if eviction:
+                prof.count("descartes", stats["descartes"])
 
     print(f"Arquivo comprimido gerado: {compressed_file_path}")
-
-def decompress_file_not_fixed(input_file_path, output_file_path):
-    # Lê o arquivo comprimido
-    with open(input_file_path, 'rb') as input_file, open(output_file_path, 'wb') as output_file:
-        compressed_data = input_file.read()
-        max_bits = compressed_data[-1]
-        size_atual = 9
-        possiveis = ((1 << size_atual) - 1) - 256
-        lidos = 0
-
-        bit_stream = io.BytesIO(compressed_data[:-1])
-
-        buffer = 0
-        bits_in_buffer = 0
-        compressed_codes = []
-
-        reverse_dicionario = {i: bytes([i]) for i in range(256)}
-
-        while True:
-            byte = bit_stream.read(1)
-            if not byte:
-                break
-
-            buffer |= (ord(byte) << bits_in_buffer)
-            bits_in_buffer += 8
-
-            while bits_in_buffer >= size_atual:
-                code = buffer & ((1 << size_atual) - 1)
-                compressed_codes.append(code)
-                lidos += 1
-                buffer >>= size_atual
-                bits_in_buffer -= size_atual
-
-                if lidos == possiveis:
-                    if size_atual < max_bits:
-                        size_atual += 1
-                        possiveis = ((1 << size_atual) - 1) - 256
-
-        prefixo = reverse_dicionario[compressed_codes.pop(0)]
-        output_file.write(prefixo)
-
-        for codigo in compressed_codes:
-            if codigo in reverse_dicionario:
-                entry = reverse_dicionario[codigo]
-            else:
-                entry = prefixo + prefixo[:1]
-
-            output_file.write(entry)
-
-            if len(reverse_dicionario) <= ((1 << max_bits) - 1):
-                reverse_dicionario[len(reverse_dicionario)] = prefixo + entry[:1]
-
-            prefixo = entry
+    return compressed_file_path
+
+def decompress_file_not_fixed(input_file_path, output_file_path, dictionary=None):
+    # Mapeia o arquivo comprimido; o corpo é lido sem cópia, sem o cabeçalho (ou o final, no formato antigo)
+    with open(input_file_path, 'rb') as input_file:
+        compressed_data = map_file(input_file)
+    header, body = split_compressed(compressed_data)
+    check_dictionary(header.dictionary_id, dictionary)
+    if header.stored:
+        raise ValueError("Arquivos com blocos guardados são descomprimidos pelo modo fixo (sem --dinamico)")
+
+    # Pelo cabeçalho, arquivos do modo fixo também são aceitos; sem ele, assume-se o modo dinâmico.
+    max_bits = header.max_bits
+    if header.entropy:
+        unpacker = EntropyUnpacker(max_bits, first_code_for(dictionary), header.mode != MODE_FIXED)
+    elif header.mode == MODE_FIXED:
+        unpacker = CodeUnpacker(max_bits)
+    else:
+        unpacker = VariableCodeUnpacker(max_bits, first_code_for(dictionary))
+    clear_code = (1 << max_bits) - 1
+    check = OutputCheck(header)
+
+    eviction = LRUEviction(first_code_for(dictionary), clear_code) if header.eviction else None
+    decoder = LZWDecoder(clear_code, clear_code, dictionary.phrases() if dictionary else None, eviction)
+
+    def decode(codes):
+        result = decoder.decode(codes)
+        check.update(result)
+        return result
+
+    with open(output_file_path, 'wb') as output_file:
+        # Desempacota e decodifica em blocos, gravando a saída a cada bloco: em pipeline
+        # (desempacotamento, decodificação e escrita em paralelo) ou em sequência, com um só
+        # processador ou com o profiler ativo (para que os tempos por fase não se misturem).
+        prof = get_profiler()
+        pieces = (body[offset:offset + CHUNK_SIZE] for offset in range(0, len(body), CHUNK_SIZE))
+        if pipeline_enabled() and not prof:
+            for result in run_pipeline(pieces, [unpacker.unpack, decode]):
+                output_file.write(result)
+        else:
+            for piece in pieces:
+                if prof:
+                    prof.switch("desempacotamento")
+                codes = unpacker.unpack(piece)
+                if prof:
+                    prof.switch("decodificacao")
+                    prof.count("codigos", len(codes))
+                result = decode(codes)
+                if prof:
+                    prof.switch("escrita")
+                output_file.write(result)
+                if prof:
+                    prof.switch(None)
+                    prof.count("bytes_saida", len(result))
+    check.finish()
 
     print(f"Arquivo descomprimido gerado: {output_file_path}")
 
-def handle_file(file_path, lzw_compressor):
+def handle_file(file_path, lzw_compressor, index_interval=None, byte_range=None, stored_blocks=False, cache=None):
     if file_path.endswith('.lzw'):
         decompressed_file_path = os.path.splitext(file_path)[0] + '_decompressed' + os.path.splitext(file_path)[1]
-        decompress_file(file_path, decompressed_file_path, lzw_compressor)
+        if byte_range is not None:
+            start, length = byte_range
+            with open(decompressed_file_path, 'wb') as output_file:
+                output_file.write(decompress_range(file_path, start, length, lzw_compressor))
+            print(f"Trecho [{start}, {start + length}) descomprimido em: {decompressed_file_path}")
+        else:
+            decompress_file(file_path, decompressed_file_path, lzw_compressor)
     else:
-        compressed_file_path = compress_file(file_path, lzw_compressor)
+        if cache is None:
+            compress_file(file_path, lzw_compressor, index_interval=index_interval, stored_blocks=stored_blocks)
+        else:
+            compressed_file_path = os.path.splitext(os.path.basename(file_path))[0] + '.lzw'
+            start = time.time()
+            if cached_compress(cache, file_path, compressed_file_path,
+                               compression_parameters(lzw_compressor, index_interval, stored_blocks),
+                               lambda: compress_file(file_path, lzw_compressor, compressed_file_path, index_interval, stored_blocks)):
+                lzw_compressor.cached_stats(compressed_file_path, time.time() - start)
+                print(f"Arquivo comprimido obtido do cache: {compressed_file_path}")
         
-def handle_file_2(file_path, quntbits=None):
+def handle_file_2(file_path, quntbits=None, clear_ratio=None, dictionary=None, entropy=False, eviction=None, cache=None):
     if file_path.endswith('.lzw'):
         decompressed_file_path = os.path.splitext(file_path)[0] + '_decompressed' + os.path.splitext(file_path)[1]
-        decompress_file_not_fixed(file_path, decompressed_file_path)
+        decompress_file_not_fixed(file_path, decompressed_file_path, dictionary)
     else:
-        LZW_not_fixed_compress(file_path, quntbits)
\ No newline at end of file
+        if cache is None:
+            LZW_not_fixed_compress(file_path, quntbits, clear_ratio, dictionary=dictionary, entropy=entropy, eviction=eviction)
+        else:
+            compressed_file_path = os.path.splitext(os.path.basename(file_path))[0] + '.lzw'
+            if cached_compress(cache, file_path, compressed_file_path,
+                               dynamic_parameters(quntbits, clear_ratio, dictionary, entropy, eviction),
+                               lambda: LZW_not_fixed_compress(file_path, quntbits, clear_ratio, compressed_file_path, dictionary,
+                                                              entropy, eviction)):
+                print(f"Arquivo comprimido obtido do cache: {compressed_file_path}")
\ No newline at end of file
@@ -4,25 +4,151 @@ import argparse
 
 from compact_trie import *
 from lzw import *
+from parallel import *
+from batch import *
+from trained_dictionary import *
+from profiling import *
+from snapshot import *
+from autotune import *
+
+SIZE_UNITS = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+def parse_size(text, minimum=1):
+    """Tamanho em bytes, com sufixo opcional K, M ou G (ex.: 4M)."""
+    unit = SIZE_UNITS.get(text[-1:].lower(), 1)
+    try:
+        value = int(text[:-1] if unit > 1 else text) * unit
+    except ValueError:
+        value = -1
+    if value < minimum:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {text}")
+    return value
+
+def parse_range(text):
+    """Trecho INICIO:TAMANHO (ambos aceitam sufixo K, M ou G)."""
+    start, _, length = text.partition(':')
+    if not length:
+        raise argparse.ArgumentTypeError(f"trecho inválido (use INICIO:TAMANHO): {text}")
+    return parse_size(start, minimum=0), parse_size(length)
 
 def main():
     parser = argparse.ArgumentParser(description='')
 
-    parser.add_argument('input_file_path', type=str, help='Caminho do arquivo de entrada')
+    parser.add_argument('input_file_path', type=str, nargs='+', help='Caminho do arquivo de entrada (no modo em lote: arquivos, diretórios, padrões glob ou @lista)')
     parser.add_argument('--max_bits', type=int, default=12, help='Número máximo de bits')
     parser.add_argument('--dinamico', action='store_true', help='Dinâmico')
     parser.add_argument('--tests', action='store_true', help='Testes')
+    parser.add_argument('--dict-engine', choices=sorted(DICT_ENGINES), default='trie', help='Implementação do dicionário (modo fixo)')
+    parser.add_argument('--clear-ratio', type=float, default=None, help='Reinicia o dicionário cheio quando a taxa cai abaixo desta fração da melhor taxa (ex.: 0.8)')
+    parser.add_argument('--variable-width', action='store_true', help='Códigos de 9 bits até max_bits (modo fixo; use também ao descomprimir)')
+    parser.add_argument('--jobs', type=int, default=None, help='Número de processos (contêiner em blocos independentes, ou arquivos simultâneos no modo em lote)')
+    parser.add_argument('--output-dir', default=None, help='Modo em lote: processa todas as entradas e grava as saídas neste diretório')
+    parser.add_argument('--train-dictionary', default=None, help='Treina um dicionário com as entradas (amostras) e o grava neste arquivo')
+    parser.add_argument('--entropy', action='store_true', help='Codificação de entropia (Huffman por blocos) sobre os códigos LZW; a descompressão detecta pelo cabeçalho. Custo: a descompressão fica cerca de 2,5 vezes mais lenta (decodificação código a código)')
+    parser.add_argument('--eviction', choices=sorted(EVICTION_POLICIES), default=None, help='Com o dicionário cheio, descarta entradas pouco usadas em vez de congelá-lo; a descompressão detecta pelo cabeçalho')
+    parser.add_argument('--stored-blocks', action='store_true', help='Guarda sem compressão os blocos de 64K que o LZW expandiria (mídia já comprimida, dados cifrados); modo fixo')
+    parser.add_argument('--auto', action='store_true', help='Escolhe max_bits, dicionário, largura dos códigos e entropia testando uma amostra da entrada (cerca de 2%% do tempo)')
+    parser.add_argument('--auto-ratio', type=float, default=None, help='Com --auto: a configuração mais rápida que atinja esta taxa de compressão')
+    parser.add_argument('--auto-throughput', type=float, default=None, help='Com --auto: a maior taxa entre as configurações que comprimam a pelo menos estes MB/s')
+    parser.add_argument('--cache', default=None, help='Diretório do cache de resultados: a mesma entrada com os mesmos parâmetros é copiada do cache em vez de comprimida')
+    parser.add_argument('--cache-size', type=parse_size, default=CACHE_SIZE, help='Espaço máximo do cache; os resultados usados há mais tempo são apagados (padrão: 1G)')
+    parser.add_argument('--dictionary', default=None, help='Dicionário treinado usado na compressão e na descompressão')
+    parser.add_argument('--index-interval', type=parse_size, default=None, help='Grava um índice de acesso aleatório com pontos de reinício a cada N bytes da entrada (ex.: 4M; modo fixo)')
+    parser.add_argument('--range', type=parse_range, default=None, help='Descomprime apenas o trecho INICIO:TAMANHO (arquivos com índice de acesso aleatório)')
+    parser.add_argument('--checkpoint', default=None, help='Grava snapshots da compressão neste arquivo e, se ele existir, retoma a compressão interrompida (modo fixo)')
+    parser.add_argument('--checkpoint-every', type=parse_size, default=CHECKPOINT_EVERY, help='Intervalo entre snapshots, em bytes da entrada (padrão: 64M)')
+    parser.add_argument('--save-dictionary', default=None, help='Grava o dicionário ao final da compressão como dicionário treinado, para usar com --dictionary (modo fixo)')
+    parser.add_argument('--profile', choices=PROFILE_MODES, default=None, help='Instrumentação: tempos por fase e contadores em JSON ("memoria" inclui o pico do tracemalloc) ou cProfile')
+    parser.add_argument('--profile-output', default=None, help='Arquivo do relatório de --profile (padrão: saída padrão)')
+    parser.add_argument('--info', action='store_true', help='Mostra o cabeçalho dos arquivos .lzw (sem descomprimir)')
 
     args = parser.parse_args()
 
+    if args.profile:
+        run_profiled(lambda: run(parser, args), args.profile, args.profile_output)
+    else:
+        run(parser, args)
+
+def run(parser, args):
+    """Executa o modo pedido na linha de comando."""
+    if args.info:
+        for path, _ in collect_inputs(args.input_file_path):
+            print_info(path)
+        return
+
+    if args.train_dictionary:
+        save_dictionary(train_dictionary([path for path, _ in collect_inputs(args.input_file_path)], args.max_bits), args.train_dictionary)
+        return
+
     if args.dinamico:
-        handle_file_2(args.input_file_path, args.max_bits)
+        # O formato dinâmico não tem índice de acesso aleatório nem blocos guardados.
+        options = (("--index-interval", args.index_interval), ("--range", args.range),
+                   ("--stored-blocks", args.stored_blocks))
+        unsupported = [option for option, value in options if value]
+        if unsupported:
+            parser.error(f"--dinamico não aceita {', '.join(unsupported)}")
+    if args.checkpoint:
+        # O snapshot não guarda o estado dos blocos guardados, do codificador de entropia nem da
+        # política de descarte.
+        options = (("--stored-blocks", args.stored_blocks), ("--entropy", args.entropy), ("--eviction", args.eviction))
+        unsupported = [option for option, value in options if value]
+        if unsupported:
+            parser.error(f"--checkpoint não aceita {', '.join(unsupported)}")
+
+    if args.output_dir:
+        run_batch(args.input_file_path, args.output_dir, args.jobs or os.cpu_count() or 1, args.max_bits,
+                  args.dict_engine, args.clear_ratio, args.variable_width, args.dinamico, args.dictionary, args.entropy,
+                  args.eviction, args.stored_blocks, args.cache, args.cache_size)
+        return
+
+    dictionary = load_dictionary(args.dictionary) if args.dictionary else None
+    # --save-dictionary precisa do dicionário da compressão, que um acerto no cache não constrói.
+    cache = ResultCache(args.cache, args.cache_size) if args.cache and not args.save_dictionary else None
+
+    if len(args.input_file_path) > 1:
+        parser.error("várias entradas exigem o modo em lote (--output-dir)")
+    args.input_file_path = args.input_file_path[0]
+    if args.auto and (args.dinamico or args.jobs):
+        parser.error("--auto escolhe o modo e a largura dos códigos; não use com --dinamico ou --jobs")
+    if args.jobs:
+        # O contêiner em blocos tem só códigos de largura fixa, sem as opções do fluxo único.
+        options = (("--dinamico", args.dinamico), ("--variable-width", args.variable_width), ("--entropy", args.entropy),
+                   ("--eviction", args.eviction), ("--clear-ratio", args.clear_ratio), ("--stored-blocks", args.stored_blocks),
+                   ("--index-interval", args.index_interval), ("--checkpoint", args.checkpoint),
+                   ("--save-dictionary", args.save_dictionary), ("--range", args.range))
+        unsupported = [option for option, value in options if value]
+        if unsupported:
+            parser.error(f"--jobs (contêiner em blocos) não aceita {', '.join(unsupported)}")
+
+    if args.jobs or (args.input_file_path.endswith('.lzw') and is_block_container(args.input_file_path)):
+        handle_file_parallel(args.input_file_path, args.max_bits, args.jobs or 1, args.dict_engine, dictionary, cache)
+    elif args.dinamico:
+        handle_file_2(args.input_file_path, args.max_bits, args.clear_ratio, dictionary, args.entropy, args.eviction, cache)
     else:
-        lzw_compressor = LZW(args.max_bits)
-        handle_file(args.input_file_path, lzw_compressor)
+        if args.auto and not args.input_file_path.endswith('.lzw'):
+            # Índice e snapshots não aceitam a codificação de entropia: ela fica fora dos testes.
+            allow_entropy = not (args.index_interval or args.checkpoint)
+            requested = {"max_bits": args.max_bits, "dict_engine": args.dict_engine, "variable_width": args.variable_width,
+                         "entropy": args.entropy and allow_entropy}
+            lzw_compressor = auto_compressor(args.input_file_path, args.auto_ratio, args.auto_throughput, allow_entropy,
+                                             requested, clear_ratio=args.clear_ratio, dictionary=dictionary, eviction=args.eviction)
+            print(f"Parâmetros automáticos: {describe_choice(lzw_compressor.stats['auto'])}")
+        else:
+            lzw_compressor = LZW(args.max_bits, args.dict_engine, args.clear_ratio, args.variable_width, dictionary, args.entropy,
+                                 args.eviction)
+        if args.checkpoint and not args.input_file_path.endswith('.lzw'):
+            compress_file_resumable(args.input_file_path, lzw_compressor, index_interval=args.index_interval,
+                                    checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every)
+        else:
+            handle_file(args.input_file_path, lzw_compressor, args.index_interval, args.range, args.stored_blocks, cache)
+        if args.save_dictionary and not args.input_file_path.endswith('.lzw'):
+            save_dictionary(dictionary_from_lzw(lzw_compressor), args.save_dictionary)
         
         if args.tests:
             lzw_compressor.print_stats()
 
+    if cache is not None and not args.input_file_path.endswith('.lzw'):
+        cache.print_stats()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,8 +2,21 @@ import os
 import io
 
 class Node:
-    def __init__(self, content=None, isEndOfWord=False, code=None):
-        self.content = content if content is not None else b""
-        self.isEndOfWord = isEndOfWord
+    """
+    Nó da trie compacta. O rótulo da aresta que chega ao nó é o trecho
+    labels[start:start + length] do buffer compartilhado da trie, então dividir uma aresta só
+    ajusta os dois intervalos, sem copiar bytes. children é None nas folhas (a maioria dos nós
+    de um dicionário LZW), o próprio nó filho quando há um só, ou um dict do primeiro byte (int)
+    do rótulo de cada filho para o nó. O nó é fim de palavra quando tem código.
+    """
+    __slots__ = ("start", "length", "code", "children")
+
+    def __init__(self, start=0, length=0, code=None):
+        self.start = start
+        self.length = length
         self.code = code
-        self.children = {}
\ No newline at end of file
+        self.children = None
+
+    @property
+    def isEndOfWord(self):
+        return self.code is not None
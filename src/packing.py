@@ -0,0 +1,307 @@
+import sys
+from array import array
+
+# Empacotamento de códigos em lote.
+# Os códigos de um grupo são colocados em posições de 32 bits (array -> int.from_bytes) e
+# compactados para a largura final em log2(n) passos, cada um feito com operações sobre
+# inteiros grandes (executadas em C), em vez de um laço Python por byte.
+
+# Número máximo de códigos processados por grupo.
+GROUP_SIZE = 4096
+
+SLOT_TYPECODE = next(t for t in "IL" if array(t).itemsize == 4)
+SLOT_BITS = 32
+
+_masks = {}
+
+def array_bytes(values):
+    """Conteúdo do array em little-endian (formato dos arquivos), sem depender da máquina."""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def array_from_bytes(typecode, data):
+    """Operação inversa de array_bytes: leitura em bloco, sem laço por elemento."""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+def _repeat(pattern, period, total_bits):
+    """Repete o padrão (inteiro) a cada `period` bits, até total_bits."""
+    unit = (b"\x01" + b"\x00" * (period // 8 - 1)) * (total_bits // period)
+    return pattern * int.from_bytes(unit, 'little')
+
+def _ladder(bits, count):
+    """Máscaras de cada passo da compactação de `count` códigos (potência de 2) com `bits` bits."""
+    key = (bits, count)
+    masks = _masks.get(key)
+    if masks is None:
+        masks = []
+        slot, per = SLOT_BITS, 1
+        while per < count:
+            # Em cada janela de 2 * slot bits, mantém a metade baixa (per * bits bits úteis).
+            masks.append((_repeat((1 << (per * bits)) - 1, 2 * slot, count * SLOT_BITS), slot - per * bits))
+            slot *= 2
+            per *= 2
+        _masks[key] = masks
+    return masks
+
+def _next_pow2(n):
+    return 1 << (n - 1).bit_length() if n > 1 else 1
+
+def pack_group(codes, bits):
+    """Concatena os códigos (até GROUP_SIZE) em um inteiro, cada um com `bits` bits, o primeiro nos bits baixos."""
+    count = _next_pow2(len(codes))
+    slots = array(SLOT_TYPECODE, codes)
+    if len(codes) < count:
+        slots.extend(array(SLOT_TYPECODE, bytes(4 * (count - len(codes)))))
+    if sys.byteorder != 'little':
+        slots.byteswap()
+
+    value = int.from_bytes(slots.tobytes(), 'little')
+    for mask, shift in _ladder(bits, count):
+        low = value & mask
+        value = low | ((value ^ low) >> shift)
+    return value
+
+def unpack_group(value, bits, n):
+    """Operação inversa de pack_group: extrai n códigos de `bits` bits do inteiro."""
+    if n == 0:
+        return []
+    count = _next_pow2(n)
+    for mask, shift in reversed(_ladder(bits, count)):
+        low = value & mask
+        value = low | ((value ^ low) << shift)
+
+    slots = array(SLOT_TYPECODE)
+    slots.frombytes(value.to_bytes(count * 4, 'little'))
+    if sys.byteorder != 'little':
+        slots.byteswap()
+    return slots[:n].tolist()
+
+class BitWriter:
+    """Fluxo de bits de saída (bit menos significativo primeiro), com largura informada a cada escrita."""
+    def __init__(self):
+        self.buffer = 0
+        self.bits_in_buffer = 0
+        self.total_bits = 0
+
+    def write(self, codes, bits):
+        """Acrescenta os códigos com `bits` bits cada e retorna os bytes completos."""
+        output = bytearray()
+        for i in range(0, len(codes), GROUP_SIZE):
+            group = codes[i:i + GROUP_SIZE]
+            value = (pack_group(group, bits) << self.bits_in_buffer) | self.buffer
+            total = self.bits_in_buffer + len(group) * bits
+            num_bytes = total >> 3
+
+            output += (value & ((1 << (num_bytes * 8)) - 1)).to_bytes(num_bytes, 'little')
+            self.buffer = value >> (num_bytes * 8)
+            self.bits_in_buffer = total & 7
+            self.total_bits += len(group) * bits
+        return bytes(output)
+
+    def flush(self):
+        """Completa o último byte com zeros."""
+        output = bytes([self.buffer & 0xFF]) if self.bits_in_buffer > 0 else b""
+        self.buffer = 0
+        self.bits_in_buffer = 0
+        return output
+
+class BitReader:
+    """Fluxo de bits de entrada: recebe bytes com feed() e extrai códigos com read()."""
+    def __init__(self):
+        self.buffer = 0
+        self.bits_in_buffer = 0
+        self.pending = b""
+        self.pos = 0
+
+    def feed(self, data):
+        # data pode ser um memoryview (ex.: fatia de um mmap); só o resto pendente é copiado.
+        self.pending = bytes(self.pending[self.pos:]) + data if self.pos < len(self.pending) else data
+        self.pos = 0
+
+    def available_bits(self):
+        return self.bits_in_buffer + 8 * (len(self.pending) - self.pos)
+
+    def read(self, bits, limit=None):
+        """Extrai todos os códigos completos de `bits` bits disponíveis (no máximo `limit`)."""
+        n = self.available_bits() // bits
+        if limit is not None:
+            n = min(n, limit)
+
+        codes = []
+        while n > 0:
+            count = min(n, GROUP_SIZE)
+            group_bits = count * bits
+
+            # Converte apenas os bytes necessários para o grupo, mantendo o inteiro pequeno.
+            needed = (group_bits - self.bits_in_buffer + 7) // 8
+            if needed > 0:
+                chunk = self.pending[self.pos:self.pos + needed]
+                self.buffer |= int.from_bytes(chunk, 'little') << self.bits_in_buffer
+                self.bits_in_buffer += 8 * needed
+                self.pos += needed
+
+            codes.extend(unpack_group(self.buffer & ((1 << group_bits) - 1), bits, count))
+            self.buffer >>= group_bits
+            self.bits_in_buffer -= group_bits
+            n -= count
+        return codes
+
+    def align(self):
+        """Descarta o que resta dos bytes recebidos: menos de um byte, o preenchimento de um flush()."""
+        self.buffer = 0
+        self.bits_in_buffer = 0
+        self.pending = b""
+        self.pos = 0
+
+    def skip(self, bits):
+        """Descarta os próximos `bits` bits (ex.: leitura que começa no meio de um byte)."""
+        if bits:
+            self.read(bits, 1)
+
+    def unread(self, codes, bits):
+        """Devolve ao início do fluxo códigos lidos a mais (ex.: depois de um código de limpeza)."""
+        value = 0
+        shift = 0
+        for i in range(0, len(codes), GROUP_SIZE):
+            group = codes[i:i + GROUP_SIZE]
+            value |= pack_group(group, bits) << shift
+            shift += len(group) * bits
+        self.buffer = value | (self.buffer << shift)
+        self.bits_in_buffer += shift
+
+class CodePacker:
+    """Empacota códigos de largura fixa em bytes, mantendo os bits pendentes entre chamadas."""
+    def __init__(self, bits):
+        self.bits = bits
+        self.writer = BitWriter()
+
+    def pack(self, codes):
+        return self.writer.write(codes, self.bits)
+
+    def flush(self):
+        return self.writer.flush()
+
+class CodeUnpacker:
+    """Extrai códigos de largura fixa de um fluxo de bytes entregue em partes."""
+    def __init__(self, bits):
+        self.bits = bits
+        self.reader = BitReader()
+
+    def unpack(self, data):
+        self.reader.feed(data)
+        return self.reader.read(self.bits)
+
+class WidthSchedule:
+    """
+    Largura dos códigos no modo de largura variável: começa em 9 bits e cresce até max_bits
+    quando o dicionário (first_code + códigos emitidos) atinge (1 << largura) - 1.
+    """
+    def __init__(self, max_bits, first_code=256):
+        self.max_bits = max_bits
+        self.first_code = first_code
+        self.transitions = 0    # aumentos de largura desde a criação (instrumentação)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.width = 9
+        self._update()
+
+    def _update(self):
+        while self.width < self.max_bits and self.first_code + self.count >= (1 << self.width) - 1:
+            self.width += 1
+            self.transitions += 1
+
+    def remaining(self):
+        """Quantos códigos ainda usam a largura atual (None se a largura não muda mais)."""
+        if self.width >= self.max_bits:
+            return None
+        return (1 << self.width) - 1 - self.first_code - self.count
+
+    def advance(self, n):
+        self.count += n
+        self._update()
+
+    def pieces(self, codes, clear_code):
+        """
+        Divide os códigos em trechos de largura constante, avançando o cronograma: gera
+        (trecho, largura). Um código de limpeza encerra o trecho (é o último código dele) e
+        reinicia o cronograma.
+        """
+        i = 0
+        while i < len(codes):
+            remaining = self.remaining()
+            n = len(codes) - i if remaining is None else min(remaining, len(codes) - i)
+            width = self.width
+            try:
+                end = codes.index(clear_code, i, i + n) + 1
+            except ValueError:
+                end = i + n
+                self.advance(n)
+            else:
+                self.reset()
+            yield codes[i:end], width
+            i = end
+
+class VariableCodePacker:
+    """
+    Empacota códigos com largura crescente (9 bits até max_bits), em segmentos de largura constante.
+    O código de limpeza ((1 << max_bits) - 1) é gravado como todos os bits em 1 na largura atual,
+    valor que nunca é um código válido, e faz a largura voltar a 9 bits.
+    """
+    def __init__(self, max_bits, first_code=256):
+        self.schedule = WidthSchedule(max_bits, first_code)
+        self.writer = BitWriter()
+        self.clear_code = (1 << max_bits) - 1
+
+    def pack(self, codes):
+        output = []
+        for segment, width in self.schedule.pieces(codes, self.clear_code):
+            if segment[-1] == self.clear_code:
+                segment[-1] = (1 << width) - 1
+            output.append(self.writer.write(segment, width))
+        return b"".join(output)
+
+    def flush(self):
+        return self.writer.flush()
+
+def variable_bits(codes, max_bits, first_code=256):
+    """Total de bits que VariableCodePacker usaria para os códigos, sem empacotá-los."""
+    schedule = WidthSchedule(max_bits, first_code)
+    return sum(len(segment) * width for segment, width in schedule.pieces(codes, (1 << max_bits) - 1))
+
+class VariableCodeUnpacker:
+    """Operação inversa de VariableCodePacker."""
+    def __init__(self, max_bits, first_code=256):
+        self.schedule = WidthSchedule(max_bits, first_code)
+        self.reader = BitReader()
+        self.clear_code = (1 << max_bits) - 1
+
+    def unpack(self, data):
+        self.reader.feed(data)
+        codes = []
+        while True:
+            remaining = self.schedule.remaining()
+            width = self.schedule.width
+            segment = self.reader.read(width, remaining)
+
+            clear = (1 << width) - 1
+            if clear in segment:
+                # Código de limpeza: o que vem depois dele usa o cronograma reiniciado.
+                n = segment.index(clear)
+                self.reader.unread(segment[n + 1:], width)
+                codes.extend(segment[:n])
+                codes.append(self.clear_code)
+                self.schedule.reset()
+                continue
+
+            codes.extend(segment)
+            self.schedule.advance(len(segment))
+            if remaining is None or len(segment) < remaining:
+                return codes
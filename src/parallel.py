@@ -0,0 +1,200 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from lzw import *
+from container import *
+from cache import *
+
+# Tamanho padrão de cada bloco independente.
+BLOCK_SIZE = 1 << 20
+
+# Um compressor por processo, reiniciado com reset() a cada bloco.
+_compressors = {}
+
+def _get_compressor(max_bits, dict_engine="trie", dictionary=None):
+    key = (max_bits, dict_engine, dictionary.id if dictionary else None)
+    lzw = _compressors.get(key)
+    if lzw is None:
+        lzw = _compressors[key] = LZW(max_bits, dict_engine, dictionary=dictionary)
+    else:
+        lzw.reset()
+    return lzw
+
+def compress_block(data, max_bits, dict_engine="trie", dictionary=None):
+    """Comprime um bloco com dicionário novo (ou o dicionário treinado) e retorna seu fluxo de bits."""
+    packer = CodePacker(max_bits)
+    return packer.pack(_get_compressor(max_bits, dict_engine, dictionary).compress(data)) + packer.flush()
+
+def decompress_block(data, max_bits, dictionary=None):
+    """Decodifica o fluxo de bits de um bloco."""
+    return _get_compressor(max_bits, dictionary=dictionary).decompress(CodeUnpacker(max_bits).unpack(data))
+
+def _read_slice(file_path, offset, length):
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+# Cache de resultados de cada processo, por (diretório, limite).
+_caches = {}
+
+def _compress_task(task):
+    """
+    Retorna o fluxo de bits do bloco, o CRC32 dos dados originais e, com o cache, se o bloco
+    veio dele (None sem cache) e quantos resultados o cache descartou.
+    """
+    file_path, offset, length, max_bits, dict_engine, dictionary, cache_dir, cache_size = task
+    data = _read_slice(file_path, offset, length)
+    if cache_dir is None:
+        return compress_block(data, max_bits, dict_engine, dictionary), zlib.crc32(data), None, 0
+
+    cache = _caches.get((cache_dir, cache_size))
+    if cache is None:
+        cache = _caches[(cache_dir, cache_size)] = ResultCache(cache_dir, cache_size)
+    evictions = cache.evictions
+    dictionary_id = f"{dictionary.id:08x}" if dictionary else None
+    key = cache.key(content_hash(data), f"bloco max_bits={max_bits} dicionario={dictionary_id}")
+    block = cache.get(key)
+    hit = block is not None
+    if not hit:
+        block = compress_block(data, max_bits, dict_engine, dictionary)
+        cache.put(key, block)
+    return block, zlib.crc32(data), hit, cache.evictions - evictions
+
+def _decompress_task(task):
+    file_path, offset, length, max_bits, dictionary = task
+    return decompress_block(_read_slice(file_path, offset, length), max_bits, dictionary)
+
+def _segment_task(task):
+    """
+    Decodifica um segmento de um arquivo com índice de acesso aleatório: os bits
+    [bit_start, bit_end) do fluxo, que começam em um ponto de reinício e terminam no código de
+    limpeza do ponto seguinte (ou no fim do fluxo).
+    """
+    file_path, max_bits, variable_width, eviction, dictionary, bit_start, bit_end = task
+    with open(file_path, 'rb') as f:
+        data = map_file(f)
+    body, _ = split_seek_index(split_compressed(data)[1])
+
+    lzw = LZW(max_bits, "flat", variable_width=variable_width, dictionary=dictionary, eviction=eviction)
+    unpacker = lzw.make_unpacker()
+    # O segmento pode começar no meio de um byte: lê esse byte e descarta os bits anteriores.
+    # Os bits do segmento seguinte no último byte (menos de 8) não formam um código.
+    pos = bit_start // 8
+    unpacker.reader.feed(body[pos:pos + 1])
+    unpacker.reader.skip(bit_start % 8)
+    return lzw.decompress(unpacker.unpack(body[pos + 1:(bit_end + 7) // 8]))
+
+def _run(func, tasks, jobs):
+    """Executa as tarefas em ordem, em um pool de processos quando jobs > 1."""
+    if jobs <= 1:
+        yield from map(func, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(func, tasks)
+
+def compress_file_parallel(input_file_path, max_bits=12, jobs=1, dict_engine="trie", block_size=BLOCK_SIZE, cache=None,
+                           dictionary=None):
+    """
+    Contêiner de blocos independentes comprimidos pelo pool de processos. Com um dicionário
+    treinado, cada bloco começa com ele, e o ID fica no cabeçalho do contêiner. Com cache
+    (ResultCache), cada bloco é procurado pelo hash do seu conteúdo: blocos já comprimidos,
+    deste ou de outros arquivos, são copiados do cache.
+    """
+    base_name = os.path.basename(input_file_path)
+    compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
+
+    size = os.path.getsize(input_file_path)
+    cache_dir, cache_size = (cache.directory, cache.max_bytes) if cache else (None, 0)
+    tasks = [(input_file_path, offset, min(block_size, size - offset), max_bits, dict_engine, dictionary, cache_dir, cache_size)
+             for offset in range(0, size, block_size)]
+
+    with open(compressed_file_path, 'wb') as f:
+        # O índice só é conhecido ao final: reserva o espaço e grava depois.
+        offset = index_size(len(tasks))
+        f.seek(offset)
+        entries = []
+
+        for task, (data, crc, hit, evictions) in zip(tasks, _run(_compress_task, tasks, jobs)):
+            if cache is not None:
+                # Os processos usam instâncias próprias do cache: os contadores voltam por aqui.
+                cache.hits += hit
+                cache.misses += not hit
+                cache.evictions += evictions
+            f.write(data)
+            entries.append((offset, task[2], len(data), crc))
+            offset += len(data)
+
+        f.seek(0)
+        write_block_index(f, max_bits, entries, dictionary.id if dictionary else None)
+
+    if cache is not None:
+        cache.refresh()
+    print(f"Arquivo comprimido gerado: {compressed_file_path}")
+    return compressed_file_path
+
+def decompress_file_parallel(input_file_path, output_file_path, jobs=1, dictionary=None):
+    with open(input_file_path, 'rb') as f:
+        max_bits, entries, dictionary_id = read_block_index(f)
+    check_dictionary(dictionary_id, dictionary)
+
+    tasks = [(input_file_path, offset, compressed_size, max_bits, dictionary) for offset, _, compressed_size, _ in entries]
+
+    with open(output_file_path, 'wb') as f:
+        for (_, original_size, _, crc), data in zip(entries, _run(_decompress_task, tasks, jobs)):
+            if len(data) != original_size:
+                raise ValueError("Bloco corrompido: tamanho descomprimido diferente do índice")
+            if crc is not None and zlib.crc32(data) != crc:
+                raise ValueError("Bloco corrompido: CRC32 diferente do índice")
+            f.write(data)
+
+    print(f"Arquivo descomprimido gerado: {output_file_path}")
+
+def decompress_indexed_parallel(input_file_path, output_file_path, jobs=1, dictionary=None):
+    """
+    Descomprime um arquivo de fluxo único gravado com índice de acesso aleatório: os segmentos
+    entre pontos de reinício são independentes e são decodificados pelo pool de processos; a
+    saída é gravada na ordem do arquivo, e o tamanho e o CRC32 do cabeçalho são conferidos.
+    """
+    with open(input_file_path, 'rb') as f:
+        data = map_file(f)
+    header, body = split_compressed(data)
+    if not header.indexed:
+        raise ValueError("O arquivo não tem índice de acesso aleatório")
+    check_dictionary(header.dictionary_id, dictionary)
+    body, index = split_seek_index(body)
+
+    bounds = [bit_offset for _, bit_offset in index] + [len(body) * 8]
+    eviction = "lru" if header.eviction else None
+    tasks = [(input_file_path, header.max_bits, header.variable_width, eviction, dictionary, bounds[i], bounds[i + 1])
+             for i in range(len(index))]
+    lengths = [index[i + 1][0] - index[i][0] for i in range(len(index) - 1)] + [None]
+    del data, body
+
+    check = OutputCheck(header)
+    with open(output_file_path, 'wb') as f:
+        for length, segment in zip(lengths, _run(_segment_task, tasks, jobs)):
+            if length is not None and len(segment) != length:
+                raise ValueError("Segmento corrompido: tamanho descomprimido diferente do índice")
+            check.update(segment)
+            f.write(segment)
+    check.finish()
+
+    print(f"Arquivo descomprimido gerado: {output_file_path}")
+
+def handle_file_parallel(file_path, max_bits, jobs=1, dict_engine="trie", dictionary=None, cache=None):
+    """
+    Com --jobs: compressão em blocos independentes, ou descompressão em paralelo de contêineres
+    de blocos e de arquivos com índice de acesso aleatório (os demais são descomprimidos em
+    pipeline, em um único processo).
+    """
+    if file_path.endswith('.lzw'):
+        decompressed_file_path = os.path.splitext(file_path)[0] + '_decompressed' + os.path.splitext(file_path)[1]
+        if is_block_container(file_path):
+            decompress_file_parallel(file_path, decompressed_file_path, jobs, dictionary)
+        elif read_info(file_path).get("pontos_de_acesso"):
+            decompress_indexed_parallel(file_path, decompressed_file_path, jobs, dictionary)
+        else:
+            decompress_file(file_path, decompressed_file_path, LZW(max_bits, dictionary=dictionary))
+    else:
+        compress_file_parallel(file_path, max_bits, jobs, dict_engine, cache=cache, dictionary=dictionary)
@@ -0,0 +1,80 @@
+import os
+import queue
+import threading
+
+# Pipeline de etapas em threads ligadas por filas limitadas: cada etapa processa um trecho
+# enquanto a seguinte processa o anterior e o consumidor (ex.: a escrita da saída) trata o
+# resultado. Com o GIL, o ganho vem de sobrepor a E/S (páginas do arquivo mapeado, escrita)
+# ao processamento; as filas limitam a memória a `depth` trechos entre duas etapas.
+
+# Número máximo de trechos em cada fila.
+PIPELINE_DEPTH = 4
+
+_END = object()
+
+def pipeline_enabled():
+    """O pipeline só compensa com mais de um processador; com um só, as threads apenas disputam o GIL."""
+    return (os.cpu_count() or 1) > 1
+
+# Intervalo (segundos) em que uma etapa bloqueada confere se o pipeline foi interrompido.
+_POLL = 0.1
+
+def _drain(source, failed):
+    """Itens de uma fila até o marcador de fim (ou até o pipeline ser interrompido)."""
+    while True:
+        try:
+            item = source.get(timeout=_POLL)
+        except queue.Empty:
+            if failed.is_set():
+                return
+            continue
+        if item is _END:
+            return
+        yield item
+
+def _put(sink, item, failed):
+    while not failed.is_set():
+        try:
+            sink.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _stage(function, items, sink, failed, errors):
+    try:
+        for item in items:
+            if not _put(sink, function(item), failed):
+                return
+        _put(sink, _END, failed)
+    except BaseException as error:
+        errors.append(error)
+        failed.set()
+
+def run_pipeline(items, stages, depth=PIPELINE_DEPTH):
+    """
+    Aplica as funções de `stages` em sequência a cada item, uma thread por etapa, e gera os
+    resultados na ordem de entrada. Um erro em qualquer etapa interrompe as demais e é
+    relançado para o consumidor; o mesmo vale se o consumidor parar antes do fim.
+    """
+    failed = threading.Event()
+    errors = []
+    threads = []
+    for function in stages:
+        sink = queue.Queue(depth)
+        threads.append(threading.Thread(target=_stage, args=(function, items, sink, failed, errors), daemon=True))
+        items = _drain(sink, failed)
+
+    for thread in threads:
+        thread.start()
+    finished = False
+    try:
+        yield from items
+        finished = True
+    finally:
+        if not finished:
+            failed.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,111 @@
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+
+# Instrumentação: tempos por fase, contadores e pico de memória. Os pontos de medição ficam
+# fora dos laços por byte (no máximo algumas chamadas por trecho processado); sem profiler
+# ativo, cada ponto custa apenas o teste de get_profiler() contra None.
+
+PROFILE_MODES = ("json", "memoria", "cprofile")
+
+_active = None
+
+def get_profiler():
+    """O profiler ativo, ou None quando a instrumentação está desligada."""
+    return _active
+
+class Profiler:
+    def __init__(self, memory=False):
+        self.timers = {}
+        self.counters = {}
+        self.marks = {}
+        self.memory = memory
+        self.peak_memory = None
+        self.phase = None
+        self.start = self.last = time.perf_counter()
+        self.end = None
+
+    def switch(self, phase):
+        """Passa a contar o tempo na fase indicada (None: fora das fases). Retorna a fase anterior."""
+        now = time.perf_counter()
+        previous = self.phase
+        if previous is not None:
+            self.timers[previous] = self.timers.get(previous, 0.0) + now - self.last
+        self.phase = phase
+        self.last = now
+        return previous
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def mark(self, name, value):
+        """Registra um valor pontual (ex.: posição em que o dicionário encheu); vale o primeiro."""
+        if value is not None:
+            self.marks.setdefault(name, value)
+
+    def report(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        counters = dict(self.counters)
+        if counters.get("codigos"):
+            # Bytes por código: da entrada na compressão, da saída na descompressão.
+            phrase_bytes = counters.get("bytes_entrada") or counters.get("bytes_saida", 0)
+            counters["tamanho_medio_frase"] = phrase_bytes / counters["codigos"]
+        return {
+            "tempo_total": end - self.start,
+            "fases": dict(sorted(self.timers.items(), key=lambda item: -item[1])),
+            "contadores": counters,
+            "marcos": self.marks,
+            "pico_memoria": self.peak_memory,
+        }
+
+def start_profiling(memory=False):
+    global _active
+    _active = Profiler(memory)
+    if memory:
+        tracemalloc.start()
+    return _active
+
+def stop_profiling():
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.switch(None)
+        profiler.end = time.perf_counter()
+        if profiler.memory:
+            profiler.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return profiler
+
+def run_profiled(function, mode, output_path=None):
+    """
+    Executa function() com a instrumentação pedida e grava o relatório em output_path (ou na
+    saída padrão): JSON com fases e contadores ("json", e "memoria" com o pico do tracemalloc),
+    ou as estatísticas do cProfile ("cprofile"; com output_path, no formato binário do pstats).
+    """
+    if mode == "cprofile":
+        profile = cProfile.Profile()
+        try:
+            profile.runcall(function)
+        finally:
+            if output_path:
+                profile.dump_stats(output_path)
+            else:
+                stream = io.StringIO()
+                pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(30)
+                sys.stdout.write(stream.getvalue())
+        return
+
+    start_profiling(memory=mode == "memoria")
+    try:
+        function()
+    finally:
+        report = json.dumps(stop_profiling().report(), indent=2, ensure_ascii=False)
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(report + "\n")
+        else:
+            print(report)
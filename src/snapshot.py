@@ -0,0 +1,190 @@
+import os
+import time
+import zlib
+import struct
+
+from lzw import *
+
+# Snapshot de uma compressão em andamento: dicionário, estado do empacotador de bits e posição
+# na entrada e na saída, gravados entre dois trechos por compress_file_resumable. Retomar a
+# partir do snapshot produz exatamente o mesmo arquivo de uma compressão sem interrupção.
+# O dicionário é gravado como arrays (dump() de cada engine) e lido em bloco, sem reinserções.
+SNAPSHOT_MAGIC = b"LZWS"
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_HEADER = struct.Struct(
+    "<4sBBBB"   # magic, versão, engine, max_bits, flags
+    "Idd"       # ID do dicionário treinado, clear_ratio, melhor taxa da ClearPolicy
+    "Ii"        # tamanho do dicionário, código do cursor (-1: nenhuma sequência pendente)
+    "QQQI"      # posição do cabeçalho, bytes lidos da entrada, bytes gravados na saída, CRC32 parcial
+    "BBQI"      # bits pendentes do BitWriter (valor e quantidade), total de bits, códigos da largura variável
+    "QQI"       # index_interval, próximo ponto de reinício, número de pontos do índice
+    "IIqQ"      # limpezas, entradas criadas, posição em que o dicionário encheu (-1), tamanho do dicionário gravado
+)
+
+SNAPSHOT_ENGINES = ("trie", "flat")
+
+FLAG_VARIABLE = 1       # códigos de largura crescente
+FLAG_PENDING = 2        # há uma sequência pendente no cursor
+FLAG_TRAINED = 4        # comprimido com dicionário treinado
+FLAG_INDEXED = 8        # com índice de acesso aleatório
+
+# Intervalo padrão (bytes da entrada) entre snapshots.
+CHECKPOINT_EVERY = 1 << 26
+
+def check_snapshot_support(lzw, stored_blocks=False):
+    """ValueError se o estado da compressão com estas opções não cabe em um snapshot."""
+    if lzw.entropy:
+        raise ValueError("Snapshots não podem ser usados com a codificação de entropia")
+    if lzw.eviction:
+        raise ValueError("Snapshots não podem ser usados com a política de descarte")
+    if stored_blocks:
+        raise ValueError("Snapshots não podem ser usados com os blocos guardados")
+
+def save_snapshot(path, writer):
+    """
+    Grava o estado de writer (LZWWriter entre duas chamadas de write()). A saída é sincronizada
+    com o disco antes, e o snapshot substitui o anterior de forma atômica.
+    """
+    lzw = writer.lzw
+    check_snapshot_support(lzw, writer.stored_blocks)
+    packer = writer.packer
+    bits = packer.writer
+    index = writer.index or []
+    dictionary = lzw.trie.dump()
+    cursor = lzw.trie.cursor_code() if lzw.pending else None
+    full_at = lzw.stats["dictionary_full_at"]
+    flags = ((FLAG_VARIABLE if lzw.variable_width else 0) |
+             (FLAG_PENDING if cursor is not None else 0) |
+             (FLAG_TRAINED if lzw.dictionary else 0) |
+             (FLAG_INDEXED if writer.index is not None else 0))
+
+    writer.fileobj.flush()
+    os.fsync(writer.fileobj.fileno())
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_ENGINES.index(lzw.dict_engine), lzw.max_bits, flags,
+        lzw.dictionary.id if lzw.dictionary else 0,
+        lzw.clear_policy.threshold if lzw.clear_policy else 0.0,
+        lzw.clear_policy.best if lzw.clear_policy else 0.0,
+        lzw.dicionario_size, -1 if cursor is None else cursor,
+        writer.header_pos, writer.length, writer.fileobj.tell(), writer.crc,
+        bits.buffer, bits.bits_in_buffer, bits.total_bits,
+        packer.schedule.count if lzw.variable_width else 0,
+        writer.index_interval or 0, writer.next_restart or 0, len(index),
+        lzw.stats["clears"], lzw.stats["entradas_criadas"], -1 if full_at is None else full_at,
+        len(dictionary))
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(b"".join(SEEK_ENTRY.pack(*entry) for entry in index))
+        f.write(dictionary)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _check_parameter(name, saved, current):
+    if saved != current:
+        raise ValueError(f"O snapshot foi gerado com outro valor de {name}: {saved} (atual: {current})")
+
+def resume_writer(path, fileobj, lzw_compressor):
+    """
+    Restaura o estado gravado por save_snapshot em lzw_compressor (criado com os mesmos
+    parâmetros da compressão original) e retorna o LZWWriter pronto para continuar. A saída
+    fileobj (aberta para leitura e escrita) é truncada no ponto em que o snapshot foi gravado.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("Snapshot incompleto")
+    (magic, version, engine, max_bits, flags, dictionary_id, clear_ratio, clear_best,
+     dicionario_size, cursor, header_pos, input_offset, output_offset, crc,
+     bit_buffer, bits_in_buffer, total_bits, schedule_count,
+     index_interval, next_restart, index_count,
+     clears, entradas_criadas, full_at, dictionary_size) = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Arquivo não é um snapshot LZW")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Versão de snapshot não suportada: {version}")
+
+    lzw = lzw_compressor
+    trained = lzw.dictionary
+    _check_parameter("max_bits", max_bits, lzw.max_bits)
+    _check_parameter("engine", SNAPSHOT_ENGINES[engine], lzw.dict_engine)
+    _check_parameter("variable_width", bool(flags & FLAG_VARIABLE), lzw.variable_width)
+    _check_parameter("clear_ratio", clear_ratio or None, lzw.clear_policy.threshold if lzw.clear_policy else None)
+    check_dictionary(dictionary_id if flags & FLAG_TRAINED else None, trained)
+
+    start = SNAPSHOT_HEADER.size
+    end = start + index_count * SEEK_ENTRY.size
+    index = [SEEK_ENTRY.unpack_from(data, offset) for offset in range(start, end, SEEK_ENTRY.size)]
+    if len(data) != end + dictionary_size:
+        raise ValueError("Snapshot corrompido")
+
+    lzw.trie = DICT_ENGINES[lzw.dict_engine].load(lzw.max_code, data[end:], cursor if flags & FLAG_PENDING else None)
+    lzw.dicionario_size = dicionario_size
+    lzw.pending = bool(flags & FLAG_PENDING)
+    if lzw.clear_policy:
+        lzw.clear_policy.best = clear_best
+    lzw.stats.update(tamanho_original=input_offset, clears=clears, entradas_criadas=entradas_criadas,
+                     dictionary_full_at=None if full_at < 0 else full_at, start=time.time())
+
+    fileobj.seek(output_offset)
+    fileobj.truncate()
+    writer = LZWWriter(fileobj, lzw, index_interval or None, header_pos=header_pos)
+    writer.length = input_offset
+    writer.crc = crc
+    if writer.index is not None:
+        writer.index = index
+        writer.next_restart = next_restart
+    writer.packer.writer.buffer = bit_buffer
+    writer.packer.writer.bits_in_buffer = bits_in_buffer
+    writer.packer.writer.total_bits = total_bits
+    if lzw.variable_width:
+        writer.packer.schedule.advance(schedule_count)
+    return writer
+
+def compress_file_resumable(input_file_path, lzw_compressor, compressed_file_path=None, index_interval=None,
+                            checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY):
+    """
+    compress_file com snapshots: a cada checkpoint_every bytes da entrada o estado é gravado em
+    checkpoint_path. Se o snapshot já existir (compressão interrompida), a compressão continua
+    de onde ele parou. O snapshot é apagado ao final.
+    """
+    # Antes de abrir a saída: um erro no primeiro snapshot deixaria um .lzw truncado.
+    check_snapshot_support(lzw_compressor)
+    if compressed_file_path is None:
+        base_name = os.path.basename(input_file_path)
+        compressed_file_path = os.path.splitext(base_name)[0] + '.lzw'
+    if checkpoint_path is None:
+        checkpoint_path = compressed_file_path + '.snapshot'
+
+    with open(input_file_path, 'rb') as f:
+        input_data = map_file(f)
+
+    if os.path.exists(checkpoint_path):
+        output_file = open(compressed_file_path, 'r+b')
+        writer = resume_writer(checkpoint_path, output_file, lzw_compressor)
+        if writer.length > len(input_data) or zlib.crc32(input_data[:writer.length]) != writer.crc:
+            output_file.close()
+            raise ValueError("A entrada não é a mesma da compressão interrompida")
+        print(f"Retomando a compressão a partir de {writer.length} bytes")
+    else:
+        output_file = open(compressed_file_path, 'wb')
+        writer = LZWWriter(output_file, lzw_compressor, index_interval)
+
+    # Em caso de erro o writer não é fechado: o arquivo fica como no último snapshot mais os
+    # trechos seguintes, que são descartados na retomada.
+    with output_file:
+        next_checkpoint = writer.length + checkpoint_every
+        for offset in range(writer.length, len(input_data), CHUNK_SIZE):
+            writer.write(input_data[offset:offset + CHUNK_SIZE])
+            if writer.length >= next_checkpoint and writer.length < len(input_data):
+                save_snapshot(checkpoint_path, writer)
+                next_checkpoint = writer.length + checkpoint_every
+        writer.close()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"Arquivo comprimido gerado: {compressed_file_path}")
+    return compressed_file_path
@@ -0,0 +1,141 @@
+import os
+import zlib
+import struct
+from array import array
+
+from lzw import *
+
+# Dicionário treinado: entradas extras (códigos 256, 257, ...) com que o dicionário começa,
+# para que arquivos pequenos já comprimam desde o início. Cada entrada é guardada como
+# (código do prefixo, último byte), o mesmo formato em que o LZW cria suas entradas.
+DICT_MAGIC = b"LZWD"
+DICT_VERSION = 1
+
+DICT_HEADER = struct.Struct("<4sBBII")     # magic, versão, max_bits do treino, ID, número de entradas
+
+# Tamanho dos trechos em que as amostras são divididas no treino (simula arquivos pequenos).
+TRAIN_PIECE = 1 << 14
+
+class TrainedDictionary:
+    def __init__(self, max_bits, prefixes, suffixes):
+        self.max_bits = max_bits
+        self.prefixes = prefixes        # array de 32 bits: código do prefixo de cada entrada
+        self.suffixes = suffixes        # bytes: último byte de cada entrada
+        self.first_code = 256 + len(suffixes)
+        # O ID identifica o conteúdo: é gravado no arquivo comprimido e conferido na descompressão.
+        self.id = zlib.crc32(suffixes, zlib.crc32(array_bytes(prefixes)))
+        self._phrases = None
+
+    def __getstate__(self):
+        # Para os processos do pool bastam os arrays: as frases são refeitas se necessário.
+        return dict(self.__dict__, _phrases=None)
+
+    def __len__(self):
+        return len(self.suffixes)
+
+    def phrases(self):
+        """Frases de todos os códigos iniciais (0 .. first_code - 1), na ordem dos códigos."""
+        if self._phrases is None:
+            phrases = [bytes([i]) for i in range(256)]
+            append = phrases.append
+            for prefix, byte in zip(self.prefixes, self.suffixes):
+                append(phrases[prefix] + BYTE_PHRASES[byte])
+            self._phrases = phrases
+        return self._phrases
+
+def _count_phrases(data, max_bits, counts):
+    """Comprime `data` com dicionário novo e soma quantas vezes cada frase foi emitida."""
+    codes = LZW(max_bits, "flat").compress(data)
+    decoder = LZWDecoder((1 << max_bits) - 1)
+    decoder.decode(codes)
+    for code in codes:
+        if code >= 256:
+            phrase = decoder.phrase(code)
+            counts[phrase] = counts.get(phrase, 0) + 1
+
+def train_dictionary(sample_paths, max_bits=12, size=None):
+    """
+    Treina um dicionário com as amostras. Cada amostra é comprimida em trechos de TRAIN_PIECE
+    bytes; as frases mais usadas (somando ao prefixo o uso das extensões, para que todo prefixo
+    de uma frase escolhida também seja escolhido) formam o dicionário. Por padrão ocupa metade
+    dos códigos livres, deixando a outra metade para o que cada arquivo adicionar.
+    """
+    max_code = (1 << max_bits) - 1
+    if size is None:
+        size = (max_code - 256) // 2
+    size = min(size, max_code - 256 - 1)
+
+    counts = {}
+    for path in sample_paths:
+        with open(path, 'rb') as f:
+            data = map_file(f)
+        for offset in range(0, len(data), TRAIN_PIECE):
+            _count_phrases(data[offset:offset + TRAIN_PIECE], max_bits, counts)
+
+    # Propaga as contagens para os prefixos, das frases mais longas para as mais curtas.
+    scores = dict(counts)
+    by_length = {}
+    for phrase in counts:
+        by_length.setdefault(len(phrase), []).append(phrase)
+    for length in range(max(by_length, default=0), 2, -1):
+        for phrase in by_length.get(length, ()):
+            prefix = phrase[:-1]
+            if prefix not in scores:
+                scores[prefix] = 0
+                by_length.setdefault(length - 1, []).append(prefix)
+            scores[prefix] += scores[phrase]
+
+    # O uso de um prefixo é >= ao de suas extensões: a seleção por uso (e, no empate, frases
+    # mais curtas primeiro) sempre inclui os prefixos antes das extensões.
+    chosen = sorted(scores, key=lambda p: (-scores[p], len(p), p))[:size]
+    chosen.sort(key=lambda p: (len(p), p))
+
+    codes = {bytes([i]): i for i in range(256)}
+    prefixes = array(SLOT_TYPECODE)
+    suffixes = bytearray()
+    for phrase in chosen:
+        codes[phrase] = 256 + len(suffixes)
+        prefixes.append(codes[phrase[:-1]])
+        suffixes.append(phrase[-1])
+    return TrainedDictionary(max_bits, prefixes, bytes(suffixes))
+
+def dictionary_from_lzw(lzw_compressor, size=None):
+    """
+    Dicionário treinado com as entradas atuais do compressor (aquecimento): arquivos parecidos
+    começam com o que esta compressão aprendeu. As entradas são lidas em bloco do dicionário
+    (entries() de cada engine); mantém as primeiras, em ordem de código, para que todo prefixo
+    continue presente. Por padrão ocupa metade dos códigos livres, como train_dictionary.
+    """
+    if lzw_compressor.eviction_policy and lzw_compressor.eviction_policy.active:
+        # Com descartes, uma entrada pode ter prefixo de código maior: as primeiras não bastam.
+        raise ValueError("O dicionário de uma compressão com descartes não pode ser exportado")
+    max_code = lzw_compressor.max_code
+    if size is None:
+        size = (max_code - 256) // 2
+    size = min(size, max_code - 256 - 1)
+    prefixes, suffixes = lzw_compressor.trie.entries()
+    return TrainedDictionary(lzw_compressor.max_bits, prefixes[:size], suffixes[:size])
+
+def save_dictionary(dictionary, path):
+    with open(path, 'wb') as f:
+        f.write(DICT_HEADER.pack(DICT_MAGIC, DICT_VERSION, dictionary.max_bits, dictionary.id, len(dictionary)))
+        f.write(array_bytes(dictionary.prefixes))
+        f.write(dictionary.suffixes)
+    print(f"Dicionário gerado: {path} ({len(dictionary)} entradas, ID {dictionary.id:08x})")
+
+def load_dictionary(path):
+    """Lê o dicionário com leituras em bloco dos arrays (sem reinserir frase por frase)."""
+    with open(path, 'rb') as f:
+        magic, version, max_bits, dictionary_id, count = DICT_HEADER.unpack(f.read(DICT_HEADER.size))
+        if magic != DICT_MAGIC:
+            raise ValueError("Arquivo não é um dicionário LZW")
+        if version != DICT_VERSION:
+            raise ValueError(f"Versão de dicionário não suportada: {version}")
+
+        prefixes = array_from_bytes(SLOT_TYPECODE, f.read(count * 4))
+        suffixes = f.read(count)
+
+    dictionary = TrainedDictionary(max_bits, prefixes, suffixes)
+    if len(suffixes) != count or dictionary.id != dictionary_id:
+        raise ValueError("Dicionário corrompido")
+    return dictionary
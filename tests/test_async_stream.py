@@ -0,0 +1,96 @@
+import os
+import sys
+import socket
+import asyncio
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from async_stream import *
+
+INPUTS = ['1.bmp', '2.txt', '3.txt', '4.txt', '5.txt', '6.txt']
+
+def load_inputs():
+    data = b""
+    for name in INPUTS:
+        with open(os.path.join(ROOT, 'inputs', name), 'rb') as f:
+            data += f.read()
+    return data
+
+async def through_socket(coder, data, chunk_size=1 << 13):
+    """
+    Envia `data` por um lado de um socketpair e devolve o que `coder(reader, writer)` escreve de
+    volta pelo outro lado, até o EOF. Retorna (bytes recebidos, retorno de coder).
+    """
+    left, right = socket.socketpair()
+    client_reader, client_writer = await asyncio.open_connection(sock=left)
+    server_reader, server_writer = await asyncio.open_connection(sock=right)
+
+    async def send():
+        for offset in range(0, len(data), chunk_size):
+            client_writer.write(data[offset:offset + chunk_size])
+            await client_writer.drain()
+        client_writer.write_eof()
+
+    async def serve():
+        result = await coder(server_reader, server_writer)
+        server_writer.write_eof()
+        return result
+
+    try:
+        _, result, received = await asyncio.gather(send(), serve(), client_reader.read())
+    finally:
+        client_writer.close()
+        server_writer.close()
+    return received, result
+
+class AsyncStreamSocketTest(unittest.IsolatedAsyncioTestCase):
+    """compress_stream e decompress_stream de ida e volta por sockets."""
+    @classmethod
+    def setUpClass(cls):
+        cls.data = load_inputs()
+
+    async def round_trip(self, lzw_compressor, stored_blocks=False):
+        compressed, (read, written) = await through_socket(
+            lambda reader, writer: compress_stream(reader, writer, lzw_compressor, stored_blocks=stored_blocks),
+            self.data)
+        self.assertEqual((read, written), (len(self.data), len(compressed)))
+        self.assertTrue(has_file_header(compressed))
+
+        decompressed, (read, written) = await through_socket(
+            lambda reader, writer: decompress_stream(reader, writer, LZW()),
+            compressed)
+        self.assertEqual((read, written), (len(compressed), len(self.data)))
+        self.assertEqual(decompressed, self.data)
+        return compressed
+
+    async def test_plain(self):
+        await self.round_trip(LZW(12, "flat"))
+
+    async def test_variable_width(self):
+        await self.round_trip(LZW(16, "trie", variable_width=True))
+
+    async def test_entropy(self):
+        await self.round_trip(LZW(12, "flat", entropy=True))
+
+    async def test_eviction(self):
+        lzw_compressor = LZW(9, "flat", eviction="lru")
+        await self.round_trip(lzw_compressor)
+        self.assertGreater(lzw_compressor.eviction_policy.evictions, 0)
+
+    async def test_stored_blocks(self):
+        # Os dados aleatórios saem em blocos armazenados, misturados aos blocos LZW.
+        self.data = os.urandom(1 << 15) + self.data[:1 << 16] + os.urandom(1 << 15)
+        compressed = await self.round_trip(LZW(12, "flat"), stored_blocks=True)
+        self.assertTrue(FileHeader.unpack(compressed[:FILE_HEADER.size]).stored)
+
+    async def test_truncated(self):
+        compressed, _ = await through_socket(
+            lambda reader, writer: compress_stream(reader, writer, LZW(12, "flat")), self.data)
+        with self.assertRaises(ValueError):
+            await through_socket(
+                lambda reader, writer: decompress_stream(reader, writer, LZW()), compressed[:FILE_HEADER.size - 1])
+
+if __name__ == '__main__':
+    unittest.main()